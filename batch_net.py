@@ -0,0 +1,213 @@
+from multiprocessing import shared_memory
+import numpy as np
+from neat.graphs import feed_forward_layers
+
+# Versões NumPy das funções de ativação do neat-python (mesmas escalas e limites)
+ACTIVATIONS = {
+    'sigmoid': lambda z: 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0))),
+    'tanh': lambda z: np.tanh(np.clip(2.5 * z, -60.0, 60.0)),
+    'sin': lambda z: np.sin(np.clip(5.0 * z, -60.0, 60.0)),
+    'gauss': lambda z: np.exp(-5.0 * np.clip(z, -3.4, 3.4) ** 2),
+    'relu': lambda z: np.maximum(z, 0.0),
+    'softplus': lambda z: 0.2 * np.log1p(np.exp(np.clip(5.0 * z, -60.0, 60.0))),
+    'identity': lambda z: z,
+    'clamped': lambda z: np.clip(z, -1.0, 1.0),
+    'abs': np.abs,
+    'square': np.square,
+}
+ACTIVATION_NAMES = list(ACTIVATIONS)
+
+class BatchNetwork:
+    """
+    Avalia as redes feed-forward de uma geração inteira de uma só vez.
+
+    Cada genoma é compilado para uma lista de "slots" em ordem topológica
+    (um slot por nó avaliado). Os valores dos nós ficam numa matriz de
+    colunas: entradas, saídas, ocultos e uma coluna de descarte usada pelos
+    slots de preenchimento. As ligações de cada slot ficam em tensores
+    preenchidos de formato (genomas, slots, ligações), com as colunas de
+    origem e os pesos. A ativação percorre os slots, e cada slot é calculado
+    para todos os genomas com poucas operações NumPy.
+
+    As entradas de cada nó são somadas na mesma ordem que o
+    FeedForwardNetwork do neat, então as saídas (e os empates no argmax) não
+    dependem de quais genomas estão no mesmo lote.
+    """
+    def __init__(self, num_inputs, num_outputs, num_columns, target, sources, weights,
+                 bias, response, activation):
+        self.num_inputs = num_inputs
+        self.num_outputs = num_outputs
+        self.num_columns = num_columns
+        self.target = target
+        self.sources = sources
+        self.weights = weights
+        self.bias = bias
+        self.response = response
+        self.activation = activation
+        self.size, self.num_slots, self.num_links = weights.shape
+
+    def __len__(self):
+        return self.size
+
+    def arrays(self):
+        """Tensores da rede compilada, uma linha (primeiro eixo) por genoma"""
+        return {'target': self.target, 'sources': self.sources, 'weights': self.weights,
+                'bias': self.bias, 'response': self.response, 'activation': self.activation}
+
+    @staticmethod
+    def create(genomes, config):
+        """Compila uma lista de genomas (ou de tuplas (genome_id, genome)) num BatchNetwork"""
+        genome_config = config.genome_config
+        input_keys = genome_config.input_keys
+        output_keys = genome_config.output_keys
+        num_inputs = len(input_keys)
+        num_outputs = len(output_keys)
+
+        # Primeiro passo: ordem de avaliação e colunas de cada genoma
+        compiled = []
+        for genome in genomes:
+            if isinstance(genome, tuple):
+                genome = genome[1]
+            connections = [cg.key for cg in genome.connections.values() if cg.enabled]
+            layers = feed_forward_layers(input_keys, output_keys, connections)
+            order = [node for layer in layers for node in layer]
+
+            columns = {key: i for i, key in enumerate(input_keys)}
+            columns.update({key: num_inputs + i for i, key in enumerate(output_keys)})
+            for node in order:
+                if node not in columns:
+                    columns[node] = len(columns)
+            compiled.append((genome, connections, order, columns))
+
+        num_slots = max([len(order) for _, _, order, _ in compiled] + [1])
+        num_links = max([len(connections) for _, connections, _, _ in compiled] + [1])
+        # Última coluna: descarte para os slots de preenchimento
+        num_columns = max([len(columns) for _, _, _, columns in compiled] + [num_inputs + num_outputs]) + 1
+        scratch = num_columns - 1
+
+        size = len(compiled)
+        target = np.full((size, num_slots), scratch, dtype=np.int64)
+        sources = np.full((size, num_slots, num_links), scratch, dtype=np.int64)
+        weights = np.zeros((size, num_slots, num_links))
+        degree = np.zeros((size, num_slots), dtype=np.int64)
+        bias = np.zeros((size, num_slots))
+        response = np.zeros((size, num_slots))
+        activation = np.zeros((size, num_slots), dtype=np.int64)
+
+        # Segundo passo: preenche os tensores
+        for g, (genome, connections, order, columns) in enumerate(compiled):
+            slots = {node: s for s, node in enumerate(order)}
+            for node, s in slots.items():
+                ng = genome.nodes[node]
+                if ng.aggregation != 'sum':
+                    raise RuntimeError(f"Agregação não suportada no BatchNetwork: {ng.aggregation!r}")
+                if ng.activation not in ACTIVATIONS:
+                    raise RuntimeError(f"Ativação não suportada no BatchNetwork: {ng.activation!r}")
+                target[g, s] = columns[node]
+                bias[g, s] = ng.bias
+                response[g, s] = ng.response
+                activation[g, s] = ACTIVATION_NAMES.index(ng.activation)
+            for inode, onode in connections:
+                if onode in slots and inode in columns:
+                    s, k = slots[onode], degree[g, slots[onode]]
+                    sources[g, s, k] = columns[inode]
+                    weights[g, s, k] = genome.connections[(inode, onode)].weight
+                    degree[g, s] += 1
+
+        # Descarta as ligações de preenchimento que nenhum genoma usa
+        num_links = max(int(degree.max(initial=0)), 1)
+        return BatchNetwork(num_inputs, num_outputs, num_columns, target,
+                            sources[:, :, :num_links], weights[:, :, :num_links],
+                            bias, response, activation)
+
+    def activate(self, inputs, rows=None):
+        """
+        Ativa as redes e retorna as saídas, formato (n, num_outputs).
+
+        inputs pode ser um único vetor de entradas (compartilhado por todas as
+        redes) ou uma matriz com uma linha por rede. rows seleciona um
+        subconjunto das redes (ex.: só os dinos vivos); quando são todas as
+        redes, em ordem, os tensores são usados direto, sem cópia.
+        """
+        if rows is not None and len(rows) == len(self.target) and \
+                np.array_equal(rows, np.arange(len(self.target))):
+            rows = None
+        if rows is None:
+            target, sources, weights = self.target, self.sources, self.weights
+            bias, response, activation = self.bias, self.response, self.activation
+        else:
+            target, sources, weights = self.target[rows], self.sources[rows], self.weights[rows]
+            bias, response, activation = self.bias[rows], self.response[rows], self.activation[rows]
+        n = len(target)
+
+        inputs = np.asarray(inputs, dtype=np.float64)
+        if inputs.shape[-1] != self.num_inputs:
+            raise RuntimeError(f"Expected {self.num_inputs} inputs, got {inputs.shape[-1]}")
+
+        values = np.zeros((n, self.num_columns))
+        values[:, :self.num_inputs] = inputs
+        index = np.arange(n)
+        for s in range(self.num_slots):
+            # Soma sequencial, como o sum() do neat (ligações de preenchimento somam 0)
+            total = np.zeros(n)
+            for k in range(self.num_links):
+                total += values[index, sources[:, s, k]] * weights[:, s, k]
+            z = bias[:, s] + response[:, s] * total
+            act = activation[:, s]
+            first = act[0] if n else 0
+            if np.all(act == first):
+                out = ACTIVATIONS[ACTIVATION_NAMES[first]](z)
+            else:
+                out = np.empty(n)
+                for a in np.unique(act):
+                    mask = act == a
+                    out[mask] = ACTIVATIONS[ACTIVATION_NAMES[a]](z[mask])
+            values[index, target[:, s]] = out
+
+        return values[:, self.num_inputs:self.num_inputs + self.num_outputs]
+
+    def actions(self, inputs, rows=None):
+        """Retorna a ação (índice da maior saída) de cada rede"""
+        return np.argmax(self.activate(inputs, rows), axis=1)
+
+class SharedNetworks:
+    """
+    As redes compiladas de uma geração num único bloco de memória compartilhada.
+
+    Os tensores de um BatchNetwork são copiados, um após o outro, para um
+    bloco SharedMemory. Os processos do pool recebem só `spec` (nome do
+    bloco, formato e posição de cada tensor) e usam attach_networks para
+    ativar as redes direto no bloco, sem receber genomas nem redes por pickle.
+
+    O bloco é liberado por close(), depois que todos os processos terminaram.
+    """
+    def __init__(self, batch):
+        layout, size = [], 0
+        for name, array in batch.arrays().items():
+            layout.append((name, array.dtype.str, array.shape, size))
+            size += -(-array.nbytes // 8) * 8  # Tensores alinhados em 8 bytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 8))
+        for (name, dtype, shape, offset), array in zip(layout, batch.arrays().values()):
+            np.ndarray(shape, dtype, buffer=self.shm.buf, offset=offset)[...] = array
+        self.spec = (self.shm.name, (batch.num_inputs, batch.num_outputs, batch.num_columns),
+                     tuple(layout))
+
+    def close(self):
+        """Libera o bloco"""
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+def attach_networks(spec, start, stop):
+    """
+    Abre o bloco de um SharedNetworks e retorna (bloco, BatchNetwork das redes start:stop).
+
+    Os tensores do BatchNetwork apontam para o bloco; o BatchNetwork deve ser
+    descartado antes de fechar o bloco (shm.close()).
+    """
+    block, (num_inputs, num_outputs, num_columns), layout = spec
+    shm = shared_memory.SharedMemory(name=block)
+    arrays = {name: np.ndarray(shape, dtype, buffer=shm.buf, offset=offset)[start:stop]
+              for name, dtype, shape, offset in layout}
+    return shm, BatchNetwork(num_inputs, num_outputs, num_columns, **arrays)
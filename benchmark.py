@@ -0,0 +1,258 @@
+import os
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import neat
+import numpy as np
+from dino import DinoGame
+from batch_net import BatchNetwork
+from capture import FrameCapture
+from evaluation import load_config
+
+# Pontos de entrada sem janela: processos de avaliação e início do treino
+IMPORT_MODULES = ('evaluation', 'vec_env', 'evaluate', 'train')
+# Dependências de janela, vídeo e gráficos que esses módulos não devem carregar
+HEAVY_MODULES = ('pygame', 'matplotlib', 'cv2')
+# Módulos que também são scripts: `python <módulo>.py --help` precisa funcionar
+CLI_MODULES = ('evaluate', 'train')
+
+def make_genomes(config, size, mutations=10, seed=0):
+    """Cria `size` genomas com algumas mutações (para ter nós ocultos)"""
+    random.seed(seed)
+    genomes = []
+    for key in range(size):
+        genome = config.genome_type(key)
+        genome.configure_new(config.genome_config)
+        for _ in range(mutations):
+            genome.mutate(config.genome_config)
+        genomes.append(genome)
+    return genomes
+
+def play_until(game, ticks):
+    """Avança o jogo com uma política simples (pula quando o obstáculo está perto)"""
+    state = game.get_state()
+    for _ in range(ticks):
+        state, reward, done = game.step(policy(state))
+        if done:
+            state = game.reset()
+    return state
+
+def policy(state):
+    """Pula quando o obstáculo está perto; barata e fora das medições"""
+    return (state[:, 1] < 0.12).astype(np.int64)
+
+def measure(fn, repeat):
+    """Executa fn `repeat` vezes e retorna a mediana do tempo por chamada (s)"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+def bench_population(config, size, ticks):
+    """Mede o custo de cada componente com `size` dinos; retorna {componente: s/chamada}"""
+    results = {}
+    game = DinoGame(num_dinos=size, headless=True, seed=1)
+    game.reset()
+    state = play_until(game, 120)  # Começa com obstáculos na tela
+
+    # Passo completo da simulação (física, colisão, recompensa, obstáculos)
+    def run_steps():
+        nonlocal state
+        for _ in range(ticks):
+            state, reward, done = game.step(policy(state))
+            if done:
+                state = game.reset()
+    results['step'] = measure(run_steps, 3) / ticks
+
+    alive = game.dinos.alive.copy()
+    results['get_state'] = measure(game.get_state, ticks)
+    results['collision'] = measure(lambda: game._check_collision(alive), ticks)
+
+    # Ativação das redes: uma a uma (neat) e em lote
+    genomes = make_genomes(config, size)
+    nets = [neat.nn.FeedForwardNetwork.create(g, config) for g in genomes]
+    inputs = game.get_state()
+    rows = [list(row) for row in inputs]
+    def activate_each():
+        for net, row in zip(nets, rows):
+            output = net.activate(row)
+            output.index(max(output))
+    results['activate_feedforward'] = measure(activate_each, 3)
+    batch = BatchNetwork.create(genomes, config)
+    results['activate_batch'] = measure(lambda: batch.actions(inputs), ticks)
+    results['compile_batch'] = measure(lambda: BatchNetwork.create(genomes, config), 3)
+
+    # Renderização (numa superfície fora da tela) e captura de frames
+    results['render'] = measure(lambda: game.render(nets[0], inputs[0], 0), ticks)
+    with tempfile.TemporaryDirectory() as tmp:
+        capture = FrameCapture(os.path.join(tmp, 'bench.mp4'))
+        results['frame_capture'] = measure(lambda: capture.capture(game.screen), ticks)
+        start = time.perf_counter()
+        capture.close()
+        results['frame_capture_flush'] = time.perf_counter() - start
+
+    results['steps_per_second'] = 1.0 / results['step']
+    return results
+
+def measure_imports(modules=IMPORT_MODULES, repeat=3):
+    """
+    Mede o tempo de importação de cada módulo num interpretador novo.
+
+    Usa `python -X importtime` e retorna {módulo: {'import_ms': mediana do
+    tempo acumulado, 'heavy': módulos de HEAVY_MODULES carregados junto}}.
+    Para os módulos de CLI_MODULES também roda `python <módulo>.py --help`
+    ('cli_error': None ou a última linha do erro; as dependências pesadas
+    carregadas pela linha de comando também entram em 'heavy').
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for module in modules:
+        times = []
+        heavy = set()
+        for _ in range(repeat):
+            stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                    capture_output=True, text=True, cwd=root, check=True).stderr
+            heavy.update(_heavy_imports(stderr))
+            times += [ms for name, ms in _import_times(stderr) if name == module]
+        result = results[module] = {'import_ms': float(np.median(times))}
+        if module in CLI_MODULES:
+            cli = subprocess.run([sys.executable, '-X', 'importtime', f'{module}.py', '--help'],
+                                 capture_output=True, text=True, cwd=root)
+            heavy.update(_heavy_imports(cli.stderr))
+            errors = [line for line in cli.stderr.splitlines() if not line.startswith('import time:')]
+            result['cli_error'] = None if cli.returncode == 0 else (errors or ['?'])[-1]
+        result['heavy'] = sorted(heavy)
+    return results
+
+def _import_times(stderr):
+    """Pares (módulo, tempo acumulado em ms) da saída de -X importtime"""
+    for line in stderr.splitlines():
+        # import time: própria [us] | acumulada [us] | módulo
+        fields = line.split('|')
+        if line.startswith('import time:') and len(fields) == 3 and fields[1].strip().isdigit():
+            yield fields[2].strip(), int(fields[1]) / 1e3
+
+def _heavy_imports(stderr):
+    return {name.split('.')[0] for name, ms in _import_times(stderr)
+            if name.split('.')[0] in HEAVY_MODULES}
+
+def check_imports(imports, budget_ms):
+    """Problemas encontrados: módulo acima do orçamento (ms) ou com dependências pesadas"""
+    problems = []
+    for module, result in imports.items():
+        if result.get('cli_error'):
+            problems.append(f"python {module}.py --help falha: {result['cli_error']}")
+        if result['heavy']:
+            problems.append(f"{module} importa {', '.join(result['heavy'])}")
+        if budget_ms and result['import_ms'] > budget_ms:
+            problems.append(f"{module} leva {result['import_ms']:.0f} ms para importar "
+                            f"(orçamento: {budget_ms:.0f} ms)")
+    return problems
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return None
+
+def run_benchmarks(config_file, sizes, ticks):
+    """Roda o benchmark para cada tamanho de população e retorna o relatório"""
+    config = load_config(config_file)
+    report = new_report(ticks)
+    for size in sizes:
+        print(f"População {size}...")
+        report['results'][str(size)] = bench_population(config, size, ticks)
+    return report
+
+def new_report(ticks=None):
+    """Relatório vazio com o ambiente da execução"""
+    return {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'ticks': ticks,
+        'results': {},
+    }
+
+def compare(report, baseline):
+    """Imprime a razão (atual / referência) do tempo de cada componente"""
+    print(f"\nComparação com {baseline.get('commit')} (tempo atual / referência):")
+    for size, results in report['results'].items():
+        for name, value in results.items():
+            old = baseline['results'].get(size, {}).get(name)
+            if old and name != 'steps_per_second':
+                print(f"  {size:>5} {name:<22} {value / old:6.2f}x")
+    for module, result in report.get('imports', {}).items():
+        old = baseline.get('imports', {}).get(module)
+        if old:
+            print(f"  {'import':>5} {module:<22} {result['import_ms'] / old['import_ms']:6.2f}x")
+
+def print_report(report):
+    for size, results in report['results'].items():
+        print(f"\nPopulação {size}:")
+        for name, value in results.items():
+            if name == 'steps_per_second':
+                print(f"  {name:<22} {value:12.1f}")
+            else:
+                print(f"  {name:<22} {value * 1e3:12.4f} ms")
+    if 'imports' in report:
+        print("\nImportação:")
+        for module, result in report['imports'].items():
+            heavy = f"  (carrega {', '.join(result['heavy'])})" if result['heavy'] else ''
+            print(f"  {module:<22} {result['import_ms']:12.1f} ms{heavy}")
+
+if __name__ == '__main__':
+    """
+    Benchmark da simulação e da avaliação, sem janela (CPU apenas).
+
+    Mede DinoGame.step, get_state, colisão, ativação das redes (uma a uma e em
+    lote), renderização e captura de frames para populações de 50, 500 e 5000
+    dinos, e grava os resultados em JSON para comparar entre commits.
+
+    Também mede o tempo de importação dos pontos de entrada sem janela
+    (IMPORT_MODULES) e termina com erro se algum passar de --import-budget
+    ms ou carregar pygame, matplotlib ou OpenCV, ou se `python train.py
+    --help` (ou evaluate.py) falhar. Com --imports-only só essa verificação
+    é feita.
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    default_config = os.path.join(os.path.dirname(__file__), 'neat-config.txt')
+    parser = argparse.ArgumentParser(description='Benchmark do Dino NEAT')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 500, 5000])
+    parser.add_argument('--ticks', type=int, default=200, help='passos por medição')
+    parser.add_argument('--config', default=default_config)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help='JSON de uma execução anterior para comparar')
+    parser.add_argument('--import-budget', type=float, default=500,
+                        help='tempo máximo de importação de cada ponto de entrada, em ms '
+                             '(0 = só verifica as dependências pesadas)')
+    parser.add_argument('--imports-only', action='store_true',
+                        help='só mede as importações (rápido, sem rodar a simulação)')
+    args = parser.parse_args()
+
+    report = new_report() if args.imports_only else run_benchmarks(args.config, args.sizes,
+                                                                   args.ticks)
+    report['imports'] = measure_imports()
+    print_report(report)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResultados salvos em {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    problems = check_imports(report['imports'], args.import_budget)
+    if problems:
+        print("\nProblemas na importação:")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
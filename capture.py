@@ -0,0 +1,117 @@
+import os
+import queue
+import threading
+import neat
+import numpy as np
+
+class FrameCapture(neat.reporting.BaseReporter):
+    """
+    Captura os frames do treinamento direto para um vídeo, em segundo plano.
+
+    capture() só copia o buffer da superfície para uma fila limitada; uma
+    thread separada converte e envia os frames para o cv2.VideoWriter, então
+    o loop do jogo não espera a codificação.
+
+    Políticas de amostragem:
+    - 'every': grava um a cada `every` frames
+    - 'best': grava só as gerações que melhoraram o melhor fitness (os frames
+      da geração vão para um segmento temporário, que é anexado ao vídeo ou
+      descartado no fim da geração)
+    - 'off': não grava nada
+
+    Também é um reporter do NEAT: adicione-o à população para que a política
+    'best' saiba quando cada geração começa e termina.
+
+    O OpenCV e o pygame só são importados ao gravar, então importar o módulo
+    (por exemplo, para ler POLICIES) é barato.
+    """
+    POLICIES = ('every', 'best', 'off')
+
+    def __init__(self, path='training.mp4', fps=30, policy='every', every=1, queue_size=64):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Política de captura inválida: {policy!r} (use {', '.join(self.POLICIES)})")
+        self.path = path
+        self.fps = fps
+        self.policy = policy
+        self.every = max(1, every)
+        self.frame_count = 0
+        self.best_fitness = None
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = None
+        if policy != 'off':
+            self.thread = threading.Thread(target=self._worker, daemon=True)
+            self.thread.start()
+
+    def capture(self, surface):
+        """Enfileira uma cópia do frame atual (se a política pedir)"""
+        frame_count = self.frame_count
+        self.frame_count += 1
+        if self.policy == 'off' or frame_count % self.every:
+            return
+        import pygame  # Já carregado por quem criou a superfície
+        self.queue.put(('frame', surface.get_size(), pygame.image.tostring(surface, 'RGB')))
+
+    def start_generation(self, generation):
+        if self.policy == 'best':
+            self.queue.put(('segment', None, None))
+
+    def post_evaluate(self, config, population, species, best_genome):
+        if self.policy != 'best':
+            return
+        improved = self.best_fitness is None or best_genome.fitness > self.best_fitness
+        if improved:
+            self.best_fitness = best_genome.fitness
+        self.queue.put(('commit' if improved else 'discard', None, None))
+
+    def close(self):
+        """Espera a fila esvaziar e finaliza o vídeo"""
+        if self.thread is not None:
+            self.queue.put(('close', None, None))
+            self.thread.join()
+            self.thread = None
+
+    def _open_writer(self, path, size):
+        import cv2
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        return cv2.VideoWriter(path, fourcc, self.fps, size)
+
+    def _worker(self):
+        """Thread de codificação: consome a fila até receber 'close'"""
+        import cv2
+        writer = None
+        segment = None
+        segment_path = self.path + '.segment.mp4'
+        size = None
+        while True:
+            kind, frame_size, data = self.queue.get()
+            if kind == 'frame':
+                if size is None:
+                    size = frame_size
+                frame = np.frombuffer(data, dtype=np.uint8).reshape(frame_size[1], frame_size[0], 3)
+                frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+                if self.policy == 'best':
+                    if segment is None:
+                        segment = self._open_writer(segment_path, size)
+                    segment.write(frame)
+                else:
+                    if writer is None:
+                        writer = self._open_writer(self.path, size)
+                    writer.write(frame)
+            elif kind in ('segment', 'commit', 'discard', 'close') and segment is not None:
+                # Fecha o segmento em andamento; anexa ao vídeo se a geração melhorou
+                segment.release()
+                segment = None
+                if kind == 'commit':
+                    if writer is None:
+                        writer = self._open_writer(self.path, size)
+                    reader = cv2.VideoCapture(segment_path)
+                    ok, frame = reader.read()
+                    while ok:
+                        writer.write(frame)
+                        ok, frame = reader.read()
+                    reader.release()
+                os.remove(segment_path)
+            if kind == 'close':
+                break
+        if writer is not None:
+            writer.release()
@@ -0,0 +1,162 @@
+import os
+import glob
+import gzip
+import pickle
+import queue
+import random
+import tempfile
+import threading
+from itertools import count
+import neat
+from evaluation import difficulty_level
+
+# Versão do formato dos checkpoints
+CHECKPOINT_VERSION = 1
+
+class TrainingCheckpointer(neat.reporting.BaseReporter):
+    """
+    Reporter do NEAT que salva checkpoints periódicos do treinamento.
+
+    A cada `every` gerações, no fim da geração, guarda a população, as
+    espécies, os contadores de genomas, espécies e nós, o estado do
+    `random`, o nível de dificuldade, o gerador de seeds do avaliador (se
+    houver) e as estatísticas do StatisticsReporter. O estado é serializado
+    na thread do treinamento (é uma cópia consistente) e comprimido e
+    gravado por uma thread separada, num arquivo temporário renomeado no
+    fim, então um checkpoint nunca fica pela metade. Com keep > 0, só os `keep` checkpoints mais recentes ficam
+    no diretório.
+
+    Para continuar um treinamento, ver restore_checkpoint.
+    """
+    def __init__(self, directory='checkpoints', every=5, keep=3, stats=None, evaluator=None):
+        self.directory = directory
+        self.every = max(1, every)
+        self.keep = keep
+        self.stats = stats
+        self.evaluator = evaluator
+        self.population = None
+        self.generation = None
+        self.queue = queue.Queue()
+        os.makedirs(directory, exist_ok=True)
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def attach(self, population):
+        """Registra-se na população (precisa dela para os contadores e o melhor genoma)"""
+        self.population = population
+        population.add_reporter(self)
+
+    def start_generation(self, generation):
+        self.generation = generation
+
+    def end_generation(self, config, population, species_set):
+        # A população recebida já é a da próxima geração
+        generation = self.generation + 1
+        if generation % self.every == 0:
+            self.save(generation)
+
+    def save(self, generation):
+        """Enfileira um checkpoint do estado atual (a próxima geração é `generation`)"""
+        p = self.population
+        genome_config = p.config.genome_config
+        state = {
+            'version': CHECKPOINT_VERSION,
+            'generation': generation,
+            'population': p.population,
+            'species': p.species.species,
+            'genome_to_species': p.species.genome_to_species,
+            'next_species_key': _peek(p.species, 'indexer'),
+            'next_genome_key': _peek(p.reproduction, 'genome_indexer'),
+            # None até a primeira mutação que cria um nó
+            'next_node_key': (_peek(genome_config, 'node_indexer')
+                              if genome_config.node_indexer is not None else None),
+            'ancestors': p.reproduction.ancestors,
+            'best_genome': p.best_genome,
+            'random_state': random.getstate(),
+            'evaluator_random_state': self.evaluator.rng.getstate() if self.evaluator else None,
+            'most_fit_genomes': self.stats.most_fit_genomes if self.stats else None,
+            'generation_statistics': self.stats.generation_statistics if self.stats else None,
+            'difficulty_level': difficulty_level(p.config),
+        }
+        data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        path = os.path.join(self.directory, f'checkpoint_gen_{generation:04d}.pkl.gz')
+        self.queue.put((path, data))
+
+    def close(self):
+        """Espera os checkpoints pendentes serem gravados"""
+        if self.thread is not None:
+            self.queue.put((None, None))
+            self.thread.join()
+            self.thread = None
+
+    def _worker(self):
+        """Thread de gravação: comprime, grava de forma atômica e remove os antigos"""
+        while True:
+            path, data = self.queue.get()
+            if path is None:
+                break
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(gzip.compress(data, compresslevel=5))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+            if self.keep > 0:
+                for old in list_checkpoints(self.directory)[:-self.keep]:
+                    os.remove(old)
+
+def _peek(obj, name):
+    """Próximo valor de um contador itertools.count sem consumi-lo"""
+    value = next(getattr(obj, name))
+    setattr(obj, name, count(value))
+    return value
+
+def list_checkpoints(directory):
+    """Checkpoints do diretório, do mais antigo para o mais recente"""
+    return sorted(glob.glob(os.path.join(directory, 'checkpoint_gen_*.pkl.gz')))
+
+def latest_checkpoint(directory):
+    """Caminho do checkpoint mais recente do diretório (None se não houver)"""
+    checkpoints = list_checkpoints(directory)
+    return checkpoints[-1] if checkpoints else None
+
+def restore_checkpoint(path, config, stats=None, evaluator=None):
+    """
+    Recria a população salva num checkpoint.
+
+    Restaura também o contador de nós (na configuração), o estado do
+    `random`, o nível de dificuldade, o gerador de seeds do avaliador e as
+    estatísticas (se forem passados), para que o treinamento continue de
+    onde parou. Os reporters devem ser adicionados à população retornada.
+    """
+    with gzip.open(path, 'rb') as f:
+        state = pickle.load(f)
+    if state['version'] != CHECKPOINT_VERSION:
+        raise ValueError(f"Versão de checkpoint não suportada: {state['version']}")
+
+    species_set = config.species_set_type(config.species_set_config, None)
+    species_set.species = state['species']
+    species_set.genome_to_species = state['genome_to_species']
+    species_set.indexer = count(state['next_species_key'])
+    p = neat.Population(config, (state['population'], species_set, state['generation']))
+    species_set.reporters = p.reporters
+    p.reproduction.genome_indexer = count(state['next_genome_key'])
+    p.reproduction.ancestors = state['ancestors']
+    p.best_genome = state['best_genome']
+    # Checkpoints antigos não têm o contador: o NEAT o recria na próxima mutação
+    if state.get('next_node_key') is not None:
+        config.genome_config.node_indexer = count(state['next_node_key'])
+
+    random.setstate(state['random_state'])
+    if evaluator is not None and state['evaluator_random_state'] is not None:
+        evaluator.rng.setstate(state['evaluator_random_state'])
+    if stats is not None and state['most_fit_genomes'] is not None:
+        stats.most_fit_genomes = state['most_fit_genomes']
+        stats.generation_statistics = state['generation_statistics']
+    if state.get('difficulty_level') and hasattr(config, 'difficulty'):
+        config.difficulty.level = state['difficulty_level']
+    return p
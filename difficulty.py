@@ -0,0 +1,104 @@
+import functools
+import math
+import numpy as np
+from sections import read_section
+
+class Difficulty:
+    """
+    Curvas de dificuldade do jogo (seção [DinoDifficulty] do arquivo do NEAT).
+
+    A dificuldade segue o progresso do episódio, a pontuação (progress =
+    score, como no jogo original) ou os ticks (progress = ticks), somado ao
+    nível atual (level, que o Curriculum aumenta durante o treinamento):
+    - speed_base, speed_growth, speed_interval, speed_max: velocidade dos
+      obstáculos, speed_base * speed_growth ** (progresso // speed_interval),
+      limitada a speed_max (0 = sem limite)
+    - gap_min, gap_max: intervalo sorteado entre obstáculos, em ms; com
+      gap_ramp > 0, vai até gap_min_end, gap_max_end ao longo de gap_ramp
+      unidades de progresso (maior densidade de obstáculos)
+    - floating_after, floating_chance: a partir desse progresso, chance de
+      cada obstáculo ser flutuante
+    - obstacle_heights: alturas sorteadas para os obstáculos
+    - level: nível inicial (progresso somado desde o primeiro tick)
+    - curriculum, curriculum_fitness, curriculum_step, curriculum_max_level:
+      ver Curriculum
+
+    Os valores padrão reproduzem o jogo original. As curvas são calculadas
+    uma vez numa tabela por valor de progresso (ver table()), compartilhada
+    pelos jogos com os mesmos parâmetros.
+    """
+    __params = [('progress', str, 'score'),
+                ('speed_base', float, 5.0),
+                ('speed_growth', float, 1.1),
+                ('speed_interval', int, 5),
+                ('speed_max', float, 0.0),
+                ('gap_min', int, 800),
+                ('gap_max', int, 2000),
+                ('gap_min_end', int, 800),
+                ('gap_max_end', int, 2000),
+                ('gap_ramp', int, 0),
+                ('floating_after', int, 20),
+                ('floating_chance', float, 0.6),
+                ('obstacle_heights', tuple, (20, 40)),
+                ('level', int, 0),
+                ('curriculum', bool, False),
+                ('curriculum_fitness', float, 100.0),
+                ('curriculum_step', int, 5),
+                ('curriculum_max_level', int, 100)]
+
+    # Tamanho das tabelas; progresso além do fim usa o último valor
+    TABLE_SIZE = 1 << 15
+
+    def __init__(self, **kwargs):
+        for name, kind, default in self.__params:
+            setattr(self, name, kind(kwargs.pop(name, default)))
+        if kwargs:
+            raise TypeError(f"Parâmetros desconhecidos: {', '.join(kwargs)}")
+        if self.progress not in ('score', 'ticks'):
+            raise RuntimeError(f"progress deve ser 'score' ou 'ticks', não {self.progress!r}")
+        if self.speed_interval < 1:
+            raise RuntimeError(f"speed_interval deve ser positivo, não {self.speed_interval}")
+        if not self.obstacle_heights:
+            raise RuntimeError("obstacle_heights precisa de pelo menos uma altura")
+
+    @classmethod
+    def parse(cls, filename, section='DinoDifficulty'):
+        """Lê a seção do arquivo de configuração; itens ausentes usam o padrão"""
+        return cls(**read_section(filename, section, cls.__params))
+
+    def curves(self):
+        """Parâmetros que definem as tabelas (sem o nível e o currículo)"""
+        return (self.speed_base, self.speed_growth, self.speed_interval, self.speed_max,
+                self.gap_min, self.gap_max, self.gap_min_end, self.gap_max_end, self.gap_ramp,
+                self.floating_after, self.floating_chance)
+
+    def table(self):
+        """Tabelas (speed, gap_min, gap_max, floating) indexadas pelo progresso"""
+        return _build_table(self.curves(), self.TABLE_SIZE)
+
+    def index(self, score, ticks):
+        """Posição nas tabelas para a pontuação e o tick atuais"""
+        progress = score if self.progress == 'score' else ticks
+        return min(progress + self.level, self.TABLE_SIZE - 1)
+
+@functools.lru_cache(maxsize=8)
+def _build_table(curves, size):
+    (speed_base, speed_growth, speed_interval, speed_max, gap_min, gap_max, gap_min_end,
+     gap_max_end, gap_ramp, floating_after, floating_chance) = curves
+    # Mesma expressão do jogo original (floats do Python), para o padrão ser idêntico
+    speed = np.array([speed_base * _power(speed_growth, p // speed_interval) for p in range(size)])
+    if speed_max > 0:
+        speed = np.minimum(speed, speed_max)
+    ramp = np.minimum(np.arange(size) / gap_ramp, 1.0) if gap_ramp > 0 else np.zeros(size)
+    gap_min = np.round(gap_min + (gap_min_end - gap_min) * ramp).astype(np.int64)
+    gap_max = np.maximum(np.round(gap_max + (gap_max_end - gap_max) * ramp).astype(np.int64), gap_min)
+    floating = np.where(np.arange(size) >= floating_after, floating_chance, 0.0)
+    for array in (speed, gap_min, gap_max, floating):
+        array.flags.writeable = False
+    return speed, gap_min, gap_max, floating
+
+def _power(base, exponent):
+    try:
+        return base ** exponent
+    except OverflowError:
+        return math.inf
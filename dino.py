@@ -1,17 +1,207 @@
-import pygame
 import random
+import contextlib
 import numpy as np
+from difficulty import Difficulty
 
-class DinoGame:
-    def __init__(self, num_dinos=10):
-        if not pygame.get_init():
-            pygame.init()
+# Importado só na primeira renderização (ver load_pygame): a simulação
+# headless e os processos de avaliação não pagam a inicialização do pygame
+pygame = None
+
+def load_pygame():
+    """Importa e inicializa o pygame, se ainda não foi feito; retorna o módulo"""
+    global pygame
+    if pygame is None:
+        import pygame as module
+        pygame = module
+    if not pygame.get_init():
+        pygame.init()
+    return pygame
+
+class NullTimer:
+    """Timer que não mede nada (padrão do DinoGame); veja profiling.PhaseTimer"""
+    ticks = 0
+    _phase = contextlib.nullcontext()
+    
+    def phase(self, name):
+        return self._phase
+
+class DinoPopulation:
+    """
+    Estado de todos os dinossauros em arrays NumPy (estrutura de arrays).
+    
+    Cada atributo tem um elemento por dino, o que permite avançar a física,
+    as colisões e as recompensas da população inteira com poucas operações
+    vetorizadas por tick.
+    """
+    def __init__(self, size, ground_y, height, crouch_height, gravity,
+                 x=50, width=40, jump_velocity=-15):
+        self.size = size
+        self.x = x  # Todos os dinos ficam na mesma coluna
+        self.width = width
+        self.ground_y = ground_y
+        self.stand_height = height
+        self.crouch_height = crouch_height
+        self.gravity = gravity
+        self.jump_velocity = jump_velocity
+        self.jump_y = self._jump_table()
+        self.reset()
+        
+    def _jump_table(self):
+        """
+        Altura do dino após cada tick de um pulo (índice 0 = no chão).
+        
+        Todo pulo começa no chão com a mesma velocidade, então a trajetória é
+        sempre a mesma parábola. Ela é calculada uma vez, com as mesmas somas
+        em ponto flutuante da integração quadro a quadro (velocidade somada à
+        altura, gravidade somada à velocidade), para dar exatamente os mesmos
+        valores; o pulo termina no primeiro tick em que a altura chegaria ao
+        chão.
+        """
+        y = np.float64(self.ground_y)
+        velocity = np.float64(self.jump_velocity)
+        table = [y]
+        while True:
+            y += velocity
+            velocity += self.gravity
+            if y >= self.ground_y:
+                return np.array(table)
+            table.append(y)
+        
+    def reset(self):
+        """Coloca todos os dinos no chão, vivos e com fitness zero"""
+        self.y = np.full(self.size, self.ground_y, dtype=np.float64)
+        self.jump_phase = np.zeros(self.size, dtype=np.int64)  # Ticks desde o início do pulo
+        self.jump = np.zeros(self.size, dtype=bool)
+        self.crouch = np.zeros(self.size, dtype=bool)
+        self.alive = np.ones(self.size, dtype=bool)
+        self.height = np.full(self.size, self.stand_height, dtype=np.float64)
+        self.fitness = np.zeros(self.size, dtype=np.float64)
+        
+    def __len__(self):
+        return self.size
+        
+    @property
+    def alive_count(self):
+        return int(np.count_nonzero(self.alive))
+        
+    def apply_actions(self, actions, mask):
+        """Aplica as ações e a gravidade aos dinossauros selecionados por mask"""
+        # Ação 0: Nada
+        # Ação 1: Pular
+        # Ação 2: Agachar
+        
+        # Reset do estado de agachar
+        stand_up = mask & self.crouch & (actions != 2)
+        self.crouch[stand_up] = False
+        self.height[stand_up] = self.stand_height
+            
+        # Aplicar ações
+        start_jump = mask & (actions == 1) & ~self.jump & ~self.crouch
+        self.jump[start_jump] = True
+        start_crouch = mask & (actions == 2) & ~self.jump
+        self.crouch[start_crouch] = True
+        self.height[start_crouch] = self.crouch_height
             
+        # Avança os que estão pulando na trajetória pré-calculada
+        jumping = mask & self.jump
+        self.jump_phase[jumping] += 1
+        landed = jumping & (self.jump_phase >= len(self.jump_y))
+        self.jump_phase[landed] = 0
+        self.jump[landed] = False
+        self.y[jumping] = self.jump_y[self.jump_phase[jumping]]
+        
+    def overlaps_x(self, ox, ow=20):
+        """Se o obstáculo em ox (largura ow) cruza a coluna ocupada pelos dinos"""
+        ox = np.trunc(ox)
+        return (self.x < ox + ow) & (ox < self.x + self.width)
+        
+    def overlaps_y(self, oy, oh, rows=slice(None)):
+        """Máscara dos dinos (dentre rows) cuja faixa vertical cruza a do obstáculo"""
+        oy, oh = np.trunc(oy), np.trunc(oh)
+        top = np.trunc(self.y[rows])
+        bottom = top + np.trunc(self.height[rows])
+        return (top < oy + oh) & (bottom > oy)
+        
+    def overlaps(self, ox, oy, oh, ow=20):
+        """
+        Máscara dos dinos que se sobrepõem ao obstáculo (ox, oy, largura ow, altura oh).
+        
+        Mesmo teste de pygame.Rect.colliderect, com as coordenadas truncadas
+        para inteiros como o Rect faz. Os argumentos podem ser escalares ou
+        arrays com um obstáculo por dino.
+        """
+        return self.overlaps_x(ox, ow) & self.overlaps_y(oy, oh)
+
+class ObstacleQueue:
+    """
+    Fila de obstáculos (x, y, altura) guardada em arrays NumPy.
+    
+    Todos os obstáculos nascem na borda direita e andam com a mesma
+    velocidade, então a fila está sempre ordenada por x: o mais próximo é
+    sempre o primeiro e os que saem da tela saem sempre pela frente. Os
+    elementos ocupam o trecho [head, tail) dos arrays; remover da frente só
+    avança head, e o espaço livre é reaproveitado quando o fim dos arrays é
+    atingido.
+    """
+    def __init__(self, capacity=16):
+        self.x = np.empty(capacity)
+        self.y = np.empty(capacity)
+        self.h = np.empty(capacity)
+        self.head = 0
+        self.tail = 0
+        
+    def __len__(self):
+        return self.tail - self.head
+        
+    def __iter__(self):
+        for i in range(self.head, self.tail):
+            yield self.x[i], self.y[i], self.h[i]
+            
+    def clear(self):
+        self.head = 0
+        self.tail = 0
+        
+    def append(self, x, y, h):
+        """Adiciona um obstáculo no fim da fila"""
+        if self.tail == len(self.x):
+            count = len(self)
+            if count * 2 > len(self.x):
+                # Fila mais que meio cheia: dobra a capacidade
+                for name in ('x', 'y', 'h'):
+                    grown = np.empty(2 * len(self.x))
+                    grown[:count] = getattr(self, name)[self.head:self.tail]
+                    setattr(self, name, grown)
+            else:
+                # Move os obstáculos ativos para o início dos arrays
+                for array in (self.x, self.y, self.h):
+                    array[:count] = array[self.head:self.tail]
+            self.head, self.tail = 0, count
+        self.x[self.tail] = x
+        self.y[self.tail] = y
+        self.h[self.tail] = h
+        self.tail += 1
+        
+    def front(self):
+        """Retorna o primeiro obstáculo (o de menor x)"""
+        return self.x[self.head], self.y[self.head], self.h[self.head]
+        
+    def popleft(self):
+        """Remove o primeiro obstáculo"""
+        self.head += 1
+
+class DinoGame:
+    def __init__(self, num_dinos=10, headless=False, fps=60, seed=None, rng=None, schedule=None,
+                 timer=None, render_fps=60, difficulty=None):
         # Configurações da tela
         self.width = 800
         self.height = 300
-        self.screen = pygame.display.set_mode((self.width, self.height))
-        pygame.display.set_caption("Dino Game - NEAT Evolution")
+        self.headless = headless
+        # Sem janela, a superfície fora da tela só é criada se render() for
+        # chamado (ver _open_screen)
+        self.screen = None
+        self.clock = None
+        if not headless:
+            self._open_screen()
         
         # Cores
         self.WHITE = (255, 255, 255)
@@ -34,277 +224,365 @@ class DinoGame:
         self.node_radius = 15
         self.connection_width = 2
         
+        # Caches da renderização: fontes, textos e painel estático de cada rede
+        self.fonts = {}
+        self.text_cache = {}
+        self.network_overlays = {}
+        # Áreas desenhadas no último frame (None = redesenhar a tela inteira)
+        self.dirty_rects = None
+        # Limite de frames por segundo da janela (None ou 0 = sem limite);
+        # não afeta o relógio simulado do jogo
+        self.render_fps = render_fps
+        
         # Configurações dos dinos
         self.num_dinos = num_dinos
-        self.dinos = []
-        self.reset_dinos()
+        self.dinos = DinoPopulation(num_dinos, self.height - 50, self.dino_height,
+                                    self.dino_crouch_height, self.gravity)
         
-        # Configurações dos obstáculos
-        self.obstacles = []
-        self.base_obstacle_speed = 5
-        self.obstacle_speed = self.base_obstacle_speed
-        self.min_obstacle_frequency = 800
-        self.max_obstacle_frequency = 2000
+        # Configurações dos obstáculos: velocidade, intervalo e tipos seguem as
+        # tabelas da dificuldade (o padrão é a curva original do jogo)
+        self.obstacles = ObstacleQueue()
+        self.difficulty = difficulty if difficulty is not None else Difficulty()
+        self.speed_table, self.gap_min_table, self.gap_max_table, self.floating_table = \
+            self.difficulty.table()
+        self.obstacle_speed = self.speed_table[self.difficulty.index(0, 0)]
         self.last_obstacle = 0
-        self.last_score_check = 0
+        
+        # Gerador próprio: com a mesma seed a sequência de obstáculos é sempre a mesma
+        self.rng = rng if rng is not None else random.Random(seed)
+        
+        # Sequência de obstáculos gravada (linhas tick, y, altura); quando
+        # fornecida, substitui o gerador aleatório
+        self.schedule = None if schedule is None else np.asarray(schedule)
+        self.schedule_pos = 0
+        # Obstáculos criados no episódio atual, no mesmo formato
+        self.spawn_log = []
+        
+        # Relógio simulado: o tempo do jogo avança um tick por passo,
+        # independente da velocidade real da simulação
+        self.fps = fps
+        self.tick_ms = 1000 / fps
+        self.ticks = 0
+        
+        # Medição de tempo por fase (física, recompensa), ver profiling.py
+        self.timer = timer if timer is not None else NullTimer()
         
         # Estado do jogo
         self.score = 0
         self.game_over = False
-        self.clock = pygame.time.Clock()
+        
+    def _open_screen(self):
+        """Cria a janela (ou, sem janela, a superfície fora da tela) e carrega o pygame"""
+        load_pygame()
+        if self.headless:
+            self.screen = pygame.Surface((self.width, self.height))
+        else:
+            self.screen = pygame.display.set_mode((self.width, self.height))
+            pygame.display.set_caption("Dino Game - NEAT Evolution")
+            self.clock = pygame.time.Clock()
         
     def reset_dinos(self):
         """Reseta todos os dinossauros para o estado inicial"""
-        self.dinos = []
-        for i in range(self.num_dinos):
-            self.dinos.append({
-                'x': 50,
-                'y': self.height - 50,
-                'width': 40,
-                'height': self.dino_height,
-                'jump': False,
-                'jump_vel': 0,
-                'crouch': False,
-                'alive': True,
-                'fitness': 0,
-                'color': self.GREEN if i == 0 else self.BLACK
-            })
+        self.dinos.reset()
         
-    def reset(self):
-        """Reseta o estado do jogo para o início"""
+    def reset(self, seed=None):
+        """Reseta o estado do jogo para o início (opcionalmente com uma nova seed)"""
+        if seed is not None:
+            self.rng.seed(seed)
         self.reset_dinos()
-        self.obstacles = []
+        self.obstacles.clear()
+        self.obstacle_speed = self.speed_table[self.difficulty.index(0, 0)]
+        self.last_obstacle = 0
+        self.schedule_pos = 0
+        self.spawn_log = []
+        self.network_overlays.clear()
+        self.dirty_rects = None
+        self.ticks = 0
         self.score = 0
         self.game_over = False
         return self.get_state()
         
     def get_state(self):
-        """Retorna o estado atual do jogo normalizado para o agente"""
+        """
+        Retorna o estado normalizado de cada dino, uma matriz (num_dinos, 4).
+        
+        Cada linha usa a posição do próprio dino; o obstáculo mais próximo é
+        o mesmo para todos (estão todos na mesma coluna x), então é buscado
+        uma única vez.
+        """
+        state = np.empty((self.dinos.size, 4))
+        state[:, 0] = self.dinos.y / self.height  # Posição vertical normalizada
+        
         if not self.obstacles:
-            return [self.dinos[0]['y'] / self.height,  # Posição vertical normalizada
-                    1.0,  # Distância máxima normalizada
-                    0.0,  # Altura normalizada
-                    0.0]  # Posição vertical do obstáculo normalizada
+            state[:, 1] = 1.0  # Distância máxima normalizada
+            state[:, 2] = 0.0  # Altura normalizada
+            state[:, 3] = 0.0  # Posição vertical do obstáculo normalizada
+            return state
         
         closest_obstacle = self._get_closest_obstacle()
-        distance = (closest_obstacle[0] - self.dinos[0]['x']) / self.width
-        height = closest_obstacle[2] / self.height
-        obstacle_y = closest_obstacle[1] / self.height  # Posição vertical do obstáculo normalizada
-        
-        return [self.dinos[0]['y'] / self.height,
-                min(1.0, max(0.0, distance)),  # Limita entre 0 e 1
-                height,
-                obstacle_y]  # Adiciona a posição vertical do obstáculo
+        distance = (closest_obstacle[0] - self.dinos.x) / self.width
+        state[:, 1] = min(1.0, max(0.0, distance))  # Limita entre 0 e 1
+        state[:, 2] = closest_obstacle[2] / self.height
+        state[:, 3] = closest_obstacle[1] / self.height  # Posição vertical do obstáculo normalizada
+        return state
                 
     def _get_closest_obstacle(self):
         """Retorna o obstáculo mais próximo do dino"""
-        return min(self.obstacles, key=lambda x: x[0])
-        
-    def _handle_actions(self, dino, action):
-        """Gerencia as ações de um dinossauro específico"""
-        # Ação 0: Nada
-        # Ação 1: Pular
-        # Ação 2: Agachar
+        return self.obstacles.front()
         
-        # Reset do estado de agachar
-        if dino['crouch'] and action != 2:
-            dino['crouch'] = False
-            dino['height'] = self.dino_height
-            
-        # Aplicar ações
-        if action == 1 and not dino['jump'] and not dino['crouch']:
-            dino['jump'] = True
-            dino['jump_vel'] = -15
-        elif action == 2 and not dino['jump']:
-            dino['crouch'] = True
-            dino['height'] = self.dino_crouch_height
-            
-        # Aplicar gravidade se estiver pulando
-        if dino['jump']:
-            dino['y'] += dino['jump_vel']
-            dino['jump_vel'] += self.gravity
-            if dino['y'] >= self.height - 50:
-                dino['y'] = self.height - 50
-                dino['jump'] = False
-                dino['jump_vel'] = 0
+    def _handle_actions(self, actions, mask):
+        """Aplica as ações e a gravidade aos dinossauros selecionados por mask"""
+        self.dinos.apply_actions(actions, mask)
                 
     def _generate_obstacle(self):
         """Gera um novo obstáculo se for o momento adequado"""
-        current_time = pygame.time.get_ticks()
+        if self.schedule is not None:
+            # Reproduz a sequência gravada
+            while (self.schedule_pos < len(self.schedule)
+                   and self.schedule[self.schedule_pos, 0] <= self.ticks):
+                tick, y_pos, height = self.schedule[self.schedule_pos]
+                self._add_obstacle(y_pos, height)
+                self.schedule_pos += 1
+            return
+            
+        current_time = self.ticks * self.tick_ms
+        i = self.difficulty.index(self.score, self.ticks)
         # Randomiza o tempo entre obstáculos
-        obstacle_frequency = random.randint(self.min_obstacle_frequency, self.max_obstacle_frequency)
+        obstacle_frequency = self.rng.randint(int(self.gap_min_table[i]), int(self.gap_max_table[i]))
         
         if current_time - self.last_obstacle > obstacle_frequency:
-            # Aumenta a chance de obstáculos flutuantes
-            if self.score >= 20 and random.random() < 0.6:  # 60% de chance de obstáculo flutuante
-                height = random.choice([20, 40])
+            # Chance de obstáculo flutuante (0 no começo do episódio)
+            floating = self.floating_table[i]
+            heights = self.difficulty.obstacle_heights
+            if floating > 0 and self.rng.random() < floating:
+                height = self.rng.choice(heights)
                 # Varia a altura do obstáculo flutuante
-                y_pos = random.randint(self.height - 200, self.height - 100)
-                self.obstacles.append([self.width, y_pos, height])
+                y_pos = self.rng.randint(self.height - 200, self.height - 100)
+                self._add_obstacle(y_pos, height)
             else:
-                height = random.choice([20, 40])
-                self.obstacles.append([self.width, self.height - height - 10, height])
+                height = self.rng.choice(heights)
+                self._add_obstacle(self.height - height - 10, height)
             self.last_obstacle = current_time
             
+    def _add_obstacle(self, y_pos, height):
+        """Coloca um obstáculo na borda direita e registra no spawn_log"""
+        self.obstacles.append(self.width, y_pos, height)
+        self.spawn_log.append((self.ticks, y_pos, height))
+            
     def _update_obstacles(self):
         """Atualiza a posição dos obstáculos e remove os que saíram da tela"""
-        for obstacle in self.obstacles[:]:
-            obstacle[0] -= self.obstacle_speed
-            if obstacle[0] < -50:
-                self.obstacles.remove(obstacle)
-                self.score += 1
-                
-                # Aumenta a velocidade em 10% a cada 5 pontos
-                if self.score - self.last_score_check >= 5:
-                    self.obstacle_speed = self.base_obstacle_speed * (1.1 ** (self.score // 5))
-                    self.last_score_check = self.score
-        
-    def _check_collision(self, dino):
-        """Verifica se um dinossauro específico colidiu com algum obstáculo"""
-        dino_rect = pygame.Rect(dino['x'], dino['y'], dino['width'], dino['height'])
-        for obstacle in self.obstacles:
-            obstacle_rect = pygame.Rect(obstacle[0], obstacle[1], 20, obstacle[2])
-            if dino_rect.colliderect(obstacle_rect):
-                return True
-        return False
-        
-    def _calculate_reward(self, dino, action):
-        """Calcula a recompensa para um dinossauro específico"""
-        reward = 0.1  # Recompensa base por sobreviver
+        obstacles = self.obstacles
+        if self.difficulty.progress == 'ticks':
+            self.obstacle_speed = self.speed_table[self.difficulty.index(self.score, self.ticks)]
+        # Os que saem da tela estão sempre na frente da fila
+        while obstacles:
+            obstacles.x[obstacles.head] -= self.obstacle_speed
+            if obstacles.x[obstacles.head] >= -50:
+                # Os demais andam juntos, já com a velocidade atualizada
+                obstacles.x[obstacles.head + 1:obstacles.tail] -= self.obstacle_speed
+                break
+            obstacles.popleft()
+            self.score += 1
+            
+            # Velocidade da nova pontuação (no padrão, 10% a mais a cada 5 pontos)
+            if self.difficulty.progress == 'score':
+                self.obstacle_speed = self.speed_table[self.difficulty.index(self.score, self.ticks)]
+        
+    def _check_collision(self, mask):
+        """Retorna a máscara dos dinossauros (dentre mask) que colidiram com algum obstáculo"""
+        d = self.dinos
+        hit = np.zeros(d.size, dtype=bool)
+        # Todos os dinos ocupam a mesma coluna e a fila está ordenada por x:
+        # só os obstáculos que cruzam essa coluna precisam do teste vertical
+        for ox, oy, oh in self.obstacles:
+            if np.trunc(ox) >= d.x + d.width:
+                break  # Este e os seguintes ainda não chegaram aos dinos
+            if d.overlaps_x(ox):
+                hit |= d.overlaps_y(oy, oh)
+        return hit & mask
+        
+    def _calculate_reward(self, actions, collided):
+        """Calcula a recompensa de cada dinossauro para as ações tomadas"""
+        reward = np.full(self.dinos.size, 0.1)  # Recompensa base por sobreviver
         
         if self.obstacles:
             closest_obstacle = self._get_closest_obstacle()
             
             # Recompensa por ações corretas
-            if closest_obstacle[1] < self.height - 100:  # Obstáculo flutuante
-                if action == 1 and 50 < (closest_obstacle[0] - dino['x']) < 100:
-                    reward += 1.0  # Recompensa por pular
-            else:  # Obstáculo no chão
-                if action == 2 and 50 < (closest_obstacle[0] - dino['x']) < 100:
-                    reward += 0.8  # Recompensa por agachar
+            if 50 < (closest_obstacle[0] - self.dinos.x) < 100:
+                if closest_obstacle[1] < self.height - 100:  # Obstáculo flutuante
+                    reward[actions == 1] += 1.0  # Recompensa por pular
+                else:  # Obstáculo no chão
+                    reward[actions == 2] += 0.8  # Recompensa por agachar
                     
         # Penalidade por colisão
-        if self._check_collision(dino):
-            reward -= 2.0
+        reward[collided] -= 2.0
             
         return reward
         
     def step(self, actions):
         """Executa um passo do jogo para todos os dinossauros vivos"""
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return None, None, True
+        if not self.headless:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return None, None, True
                 
-        for i, dino in enumerate(self.dinos):
-            if dino['alive']:
-                self._handle_actions(dino, actions[i])
-                if self._check_collision(dino):
-                    dino['alive'] = False
-                    dino['color'] = self.RED
-                else:
-                    dino['fitness'] += self._calculate_reward(dino, actions[i])
+        self.ticks += 1
+        self.timer.ticks += 1
+        
+        actions = np.asarray(actions)
+        alive = self.dinos.alive
+        with self.timer.phase('physics'):
+            self._handle_actions(actions, alive)
+            collided = self._check_collision(alive)
+        with self.timer.phase('reward'):
+            survivors = alive & ~collided
+            reward = self._calculate_reward(actions, collided)
+            self.dinos.fitness[survivors] += reward[survivors]
+        alive[collided] = False
                     
-        self._generate_obstacle()
-        self._update_obstacles()
+        with self.timer.phase('physics'):
+            self._generate_obstacle()
+            self._update_obstacles()
+            state = self.get_state()
         
-        if all(not dino['alive'] for dino in self.dinos):
+        if not alive.any():
             self.game_over = True
-            return self.get_state(), -10, True
+            return state, -10, True
             
-        return self.get_state(), 0.1, False
+        return state, 0.1, False
+        
+    def snapshot(self):
+        """
+        Cópia do estado visível do jogo (dinos, obstáculos e pontuação).
         
-    def _draw_dino(self, dino):
+        Serve para renderizar o jogo em outra thread (ver spectator.py) sem
+        tocar nos arrays que a simulação continua alterando.
+        """
+        d = self.dinos
+        q = self.obstacles
+        return {
+            'y': d.y.copy(),
+            'height': d.height.copy(),
+            'crouch': d.crouch.copy(),
+            'alive': d.alive.copy(),
+            'fitness': d.fitness.copy(),
+            'obstacles': np.stack([q.x[q.head:q.tail], q.y[q.head:q.tail], q.h[q.head:q.tail]], axis=1),
+            'score': self.score,
+            'ticks': self.ticks,
+        }
+        
+    def load_snapshot(self, snapshot):
+        """Restaura o estado visível salvo por snapshot() (para renderizar)"""
+        d = self.dinos
+        d.y[:] = snapshot['y']
+        d.height[:] = snapshot['height']
+        d.crouch[:] = snapshot['crouch']
+        d.alive[:] = snapshot['alive']
+        d.fitness[:] = snapshot['fitness']
+        self.obstacles.clear()
+        for x, y, h in snapshot['obstacles']:
+            self.obstacles.append(x, y, h)
+        self.score = snapshot['score']
+        self.ticks = snapshot['ticks']
+        
+    def _draw_dino(self, i):
         """Desenha um dinossauro específico na tela"""
-        if dino['crouch']:
+        d = self.dinos
+        color = self.GREEN if i == 0 else self.BLACK
+        if d.crouch[i]:
             # Desenha o dino agachado
-            pygame.draw.rect(self.screen, dino['color'], 
-                           (dino['x'], dino['y'] + (self.dino_height - self.dino_crouch_height), 
-                            dino['width'], self.dino_crouch_height))
+            return pygame.draw.rect(self.screen, color, 
+                                  (d.x, d.y[i] + (self.dino_height - self.dino_crouch_height), 
+                                   d.width, self.dino_crouch_height))
         else:
             # Desenha o dino em pé
-            pygame.draw.rect(self.screen, dino['color'], 
-                           (dino['x'], dino['y'], dino['width'], dino['height']))
+            return pygame.draw.rect(self.screen, color, 
+                                  (d.x, d.y[i], d.width, d.height[i]))
                         
     def _draw_obstacles(self):
         """Desenha os obstáculos na tela"""
-        for obstacle in self.obstacles:
-            pygame.draw.rect(self.screen, self.BLACK,
-                           (obstacle[0], obstacle[1], 20, obstacle[2]))
+        return [pygame.draw.rect(self.screen, self.BLACK,
+                                 (obstacle[0], obstacle[1], 20, obstacle[2]))
+                for obstacle in self.obstacles]
                            
+    def _font(self, size):
+        """Fonte padrão do tamanho pedido, carregada uma vez só"""
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = pygame.font.Font(None, size)
+        return font
+        
+    def _text(self, text, size):
+        """Superfície com o texto renderizado, reaproveitada entre frames"""
+        key = (text, size)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            if len(self.text_cache) >= 256:
+                self.text_cache.clear()
+            surface = self.text_cache[key] = self._font(size).render(text, True, self.BLACK)
+        return surface
+        
     def _draw_score(self):
         """Desenha a pontuação na tela"""
-        font = pygame.font.Font(None, 36)
-        score_text = font.render(f'Score: {self.score}', True, self.BLACK)
-        self.screen.blit(score_text, (10, 10))
+        rects = [self.screen.blit(self._text(f'Score: {self.score}', 36), (10, 10))]
         
         # Mostra o número de dinos vivos
-        alive_count = sum(1 for dino in self.dinos if dino['alive'])
-        alive_text = font.render(f'Dinos Vivos: {alive_count}', True, self.BLACK)
-        self.screen.blit(alive_text, (10, 40))
+        alive_count = self.dinos.alive_count
+        rects.append(self.screen.blit(self._text(f'Dinos Vivos: {alive_count}', 36), (10, 40)))
+        return rects
         
-    def _draw_network(self, net, state, action):
-        """Desenha a rede neural em tempo real"""
-        # Desenha o painel de fundo
-        pygame.draw.rect(self.screen, self.WHITE, 
-                        (self.network_panel_x, self.network_panel_y,
-                         self.network_panel_width, self.network_panel_height))
-        pygame.draw.rect(self.screen, self.BLACK, 
-                        (self.network_panel_x, self.network_panel_y,
-                         self.network_panel_width, self.network_panel_height), 2)
-        
-        # Calcula as posições dos nós
+    def _network_layout(self, net):
+        """Posições dos nós do painel da rede"""
         input_nodes = 4
         output_nodes = 3
         hidden_nodes = len(net.node_evals) - input_nodes - output_nodes
-        
-        # Espaçamento entre nós
         input_spacing = self.network_panel_height / (input_nodes + 1)
         output_spacing = self.network_panel_height / (output_nodes + 1)
         hidden_spacing = self.network_panel_height / (hidden_nodes + 1) if hidden_nodes > 0 else 0
-        
-        # Desenha os nós de entrada
         input_x = self.network_panel_x + 50
-        for i in range(input_nodes):
-            y = self.network_panel_y + input_spacing * (i + 1)
-            # Cor baseada no valor da entrada
-            value = state[i]
-            color = (int(255 * (1 - value)), int(255 * value), 0)
-            pygame.draw.circle(self.screen, color, (input_x, int(y)), self.node_radius)
-            
-            # Rótulo da entrada
-            font = pygame.font.Font(None, 20)
-            labels = ["Y Dino", "Dist", "Alt", "Y Obs"]
-            text = font.render(labels[i], True, self.BLACK)
-            self.screen.blit(text, (input_x - 30, int(y) - 10))
-            
-        # Desenha os nós de saída
         output_x = self.network_panel_x + self.network_panel_width - 50
-        for i in range(output_nodes):
-            y = self.network_panel_y + output_spacing * (i + 1)
-            # Cor baseada na ação escolhida
-            color = self.GREEN if i == action else self.BLUE
-            pygame.draw.circle(self.screen, color, (output_x, int(y)), self.node_radius)
-            
-            # Rótulo da saída
-            font = pygame.font.Font(None, 20)
-            labels = ["Nada", "Pular", "Agachar"]
-            text = font.render(labels[i], True, self.BLACK)
-            self.screen.blit(text, (output_x + 20, int(y) - 10))
-            
+        inputs = [(input_x, int(self.network_panel_y + input_spacing * (i + 1)))
+                  for i in range(input_nodes)]
+        outputs = [(output_x, int(self.network_panel_y + output_spacing * (i + 1)))
+                   for i in range(output_nodes)]
+        return inputs, outputs, hidden_nodes, hidden_spacing, input_spacing
+        
+    def _network_overlay(self, net):
+        """
+        Pré-renderiza a parte estática do painel (nós ocultos e conexões).
+        
+        A topologia não muda durante o episódio, então é desenhada uma vez por
+        rede numa superfície com colorkey, recortada para a área ocupada, e
+        depois só copiada por cima dos nós de entrada e saída a cada frame.
+        """
+        cached = self.network_overlays.get(id(net))
+        if cached is not None and cached[0] is net:
+            return cached[1], cached[2]
+        inputs, outputs, hidden_nodes, hidden_spacing, input_spacing = self._network_layout(net)
+        input_nodes = len(inputs)
+        input_x = inputs[0][0]
+        output_x = outputs[0][0]
+        key = (255, 0, 255)  # Cor transparente: nenhum nó ou conexão usa magenta
+        layer = pygame.Surface((self.width, self.height))
+        layer.fill(key)
+        layer.set_colorkey(key)
+        
         # Desenha os nós ocultos e conexões
         if hidden_nodes > 0:
             hidden_x = (input_x + output_x) // 2
             for i, (node_id, activation_function, aggregation_function, bias, response, links) in enumerate(net.node_evals):
                 if i >= input_nodes and i < input_nodes + hidden_nodes:
                     y = self.network_panel_y + hidden_spacing * (i - input_nodes + 1)
-                    pygame.draw.circle(self.screen, self.YELLOW, (hidden_x, int(y)), self.node_radius)
+                    pygame.draw.circle(layer, self.YELLOW, (hidden_x, int(y)), self.node_radius)
                     
                     # Desenha conexões
                     for in_node_id, weight in links:
                         if in_node_id is not None:
                             # Cor da conexão baseada no peso
+                            # (|peso| > 1 satura em vermelho)
                             color = (min(255, int(255 * abs(weight))), 
-                                    min(255, int(255 * (1 - abs(weight)))), 0)
+                                    max(0, int(255 * (1 - abs(weight)))), 0)
                             
                             # Desenha a linha da conexão
                             start_x = input_x if in_node_id < input_nodes else hidden_x
@@ -312,34 +590,91 @@ class DinoGame:
                             end_x = hidden_x if i < input_nodes + hidden_nodes else output_x
                             end_y = y
                             
-                            pygame.draw.line(self.screen, color, 
+                            pygame.draw.line(layer, color, 
                                            (start_x, int(start_y)), 
                                            (end_x, int(end_y)), 
                                            self.connection_width)
         
+        area = layer.get_bounding_rect()
+        overlay = layer.subsurface(area).copy() if area.width and area.height else None
+        self.network_overlays[id(net)] = (net, overlay, area.topleft)
+        return overlay, area.topleft
+        
+    def _draw_network(self, net, state, action):
+        """Desenha a rede neural em tempo real"""
+        # Desenha o painel de fundo
+        panel = (self.network_panel_x, self.network_panel_y,
+                 self.network_panel_width, self.network_panel_height)
+        rects = [pygame.draw.rect(self.screen, self.WHITE, panel),
+                 pygame.draw.rect(self.screen, self.BLACK, panel, 2)]
+        inputs, outputs, *_ = self._network_layout(net)
+        
+        # Desenha os nós de entrada
+        labels = ["Y Dino", "Dist", "Alt", "Y Obs"]
+        for i, (x, y) in enumerate(inputs):
+            # Cor baseada no valor da entrada
+            value = state[i]
+            color = (int(255 * (1 - value)), int(255 * value), 0)
+            pygame.draw.circle(self.screen, color, (x, y), self.node_radius)
+            
+            # Rótulo da entrada
+            rects.append(self.screen.blit(self._text(labels[i], 20), (x - 30, y - 10)))
+            
+        # Desenha os nós de saída
+        labels = ["Nada", "Pular", "Agachar"]
+        for i, (x, y) in enumerate(outputs):
+            # Cor baseada na ação escolhida
+            color = self.GREEN if i == action else self.BLUE
+            pygame.draw.circle(self.screen, color, (x, y), self.node_radius)
+            
+            # Rótulo da saída
+            rects.append(self.screen.blit(self._text(labels[i], 20), (x + 20, y - 10)))
+            
+        # Nós ocultos e conexões (pré-renderizados)
+        overlay, position = self._network_overlay(net)
+        if overlay is not None:
+            rects.append(self.screen.blit(overlay, position))
+        return rects
+        
     def render(self, net=None, state=None, action=None):
-        """Renderiza o estado atual do jogo e a rede neural"""
+        """
+        Renderiza o estado atual do jogo e a rede neural.
+        
+        Só as áreas desenhadas no frame anterior são apagadas e só elas e as
+        do frame atual são enviadas para a janela (dirty rects). Com
+        render_fps, limita a taxa de frames da janela; sem ele, não espera.
+        """
+        if self.screen is None:
+            self._open_screen()
         try:
-            self.screen.fill(self.WHITE)
+            if self.dirty_rects is None:
+                self.screen.fill(self.WHITE)
+                erased = [self.screen.get_rect()]
+            else:
+                # Apaga o que foi desenhado no frame anterior
+                erased = self.dirty_rects
+                for rect in erased:
+                    self.screen.fill(self.WHITE, rect)
             
             # Desenha todos os dinos
-            for dino in self.dinos:
-                if dino['alive']:
-                    self._draw_dino(dino)
+            drawn = [self._draw_dino(i) for i in np.flatnonzero(self.dinos.alive)]
                     
-            self._draw_obstacles()
-            self._draw_score()
+            drawn += self._draw_obstacles()
+            drawn += self._draw_score()
             
             # Desenha a rede neural se fornecida
             if net is not None and state is not None and action is not None:
-                self._draw_network(net, state, action)
+                drawn += self._draw_network(net, state, action)
+            self.dirty_rects = drawn
             
-            pygame.display.flip()
-            self.clock.tick(60)
+            if not self.headless:
+                pygame.display.update(erased + drawn)
+                if self.render_fps:
+                    self.clock.tick(self.render_fps)
         except pygame.error:
             return
         
     def close(self):
         """Fecha o jogo e limpa os recursos"""
-        if pygame.get_init():
+        if pygame is not None and pygame.get_init():
             pygame.quit() 
\ No newline at end of file
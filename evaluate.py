@@ -0,0 +1,138 @@
+import os
+import argparse
+import json
+import multiprocessing
+import pickle
+import numpy as np
+from evaluation import load_config
+from vec_env import play_genomes
+
+def load_genomes(paths):
+    """
+    Carrega genomas salvos com pickle (ex.: best_genome.pkl).
+
+    Cada arquivo pode ter um genoma ou uma lista de genomas; retorna pares
+    (nome, genoma), com o caminho do arquivo (e a posição na lista, se houver).
+    """
+    genomes = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            loaded = pickle.load(f)
+        name = path
+        if isinstance(loaded, (list, tuple)):
+            for i, genome in enumerate(loaded):
+                genome = genome[1] if isinstance(genome, tuple) else genome
+                genomes.append((f'{name}[{i}]', genome))
+        else:
+            genomes.append((name, loaded))
+    return genomes
+
+def _play_chunk(genomes, config, seeds, max_ticks):
+    return play_genomes(genomes, config, seeds, max_ticks)
+
+def evaluate_seeds(genomes, config, seeds, workers=1, max_ticks=None):
+    """
+    Joga todos os genomas em todas as seeds, sem janela.
+
+    As seeds são divididas entre `workers` processos; cada um joga todos os
+    genomas nas suas seeds num VecDinoEnv. Retorna arrays (genomas, seeds)
+    de fitness, ticks sobrevividos e pontuação.
+    """
+    seeds = np.asarray(seeds, dtype=np.int64)
+    workers = max(1, min(workers, len(seeds)))
+    if workers == 1:
+        return play_genomes(genomes, config, seeds, max_ticks)
+    chunks = np.array_split(seeds, workers)
+    pool = multiprocessing.Pool(workers)
+    try:
+        results = pool.starmap(_play_chunk, [(genomes, config, chunk, max_ticks) for chunk in chunks])
+    finally:
+        pool.close()
+        pool.join()
+    return tuple(np.concatenate(parts, axis=1) for parts in zip(*results))
+
+def summarize(fitness, ticks, score):
+    """Estatísticas de um genoma ao longo das seeds"""
+    return {
+        'episodes': len(fitness),
+        'fitness_mean': float(np.mean(fitness)),
+        'fitness_p5': float(np.percentile(fitness, 5)),
+        'fitness_p95': float(np.percentile(fitness, 95)),
+        'fitness_max': float(np.max(fitness)),
+        'ticks_mean': float(np.mean(ticks)),
+        'ticks_p5': float(np.percentile(ticks, 5)),
+        'ticks_p95': float(np.percentile(ticks, 95)),
+        'ticks_max': int(np.max(ticks)),
+        'score_mean': float(np.mean(score)),
+        'score_max': int(np.max(score)),
+    }
+
+def print_report(report):
+    print(f"{'genoma':<24} {'fitness médio':>13} {'p5':>9} {'p95':>9} {'máx':>9} "
+          f"{'ticks médio':>11} {'p5':>7} {'p95':>7} {'máx':>7} {'pontos':>7}")
+    for name, s in report.items():
+        print(f"{name:<24} {s['fitness_mean']:13.2f} {s['fitness_p5']:9.2f} {s['fitness_p95']:9.2f} "
+              f"{s['fitness_max']:9.2f} {s['ticks_mean']:11.1f} {s['ticks_p5']:7.0f} "
+              f"{s['ticks_p95']:7.0f} {s['ticks_max']:7d} {s['score_mean']:7.1f}")
+
+def render_seed(genomes, config, seed, render_fps=60, video=None):
+    """Joga a seed com janela (um dino por genoma), opcionalmente gravando um vídeo"""
+    import pygame
+    from capture import FrameCapture
+    from train import eval_genomes
+    pygame.init()
+    capture = FrameCapture(video) if video else None
+    try:
+        eval_genomes(list(enumerate(genomes)), config, seed=seed, capture=capture,
+                     render_fps=render_fps)
+    finally:
+        if capture is not None:
+            capture.close()
+
+if __name__ == '__main__':
+    """
+    Avalia genomas salvos sem janela, em várias seeds e em paralelo.
+
+    Exemplos:
+      python evaluate.py best_genome.pkl --seeds 200
+      python evaluate.py run_a/best_genome.pkl run_b/best_genome.pkl --workers 0
+      python evaluate.py best_genome.pkl --render 7 --video seed7.mp4
+    """
+    default_config = os.path.join(os.path.dirname(__file__), 'neat-config.txt')
+    parser = argparse.ArgumentParser(description='Avalia genomas salvos do Dino')
+    parser.add_argument('genomes', nargs='+', help='genomas salvos com pickle')
+    parser.add_argument('--config', default=default_config, help='configuração do NEAT')
+    parser.add_argument('--seeds', type=int, default=100, help='número de seeds avaliadas')
+    parser.add_argument('--first-seed', type=int, default=0, help='primeira seed avaliada')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='processos para avaliar as seeds (0 = todos os núcleos)')
+    parser.add_argument('--max-steps', type=int,
+                        help='ticks máximos por episódio (padrão: max_steps de [DinoEval])')
+    parser.add_argument('--output', help='grava as estatísticas em JSON')
+    parser.add_argument('--render', type=int, metavar='SEED',
+                        help='depois da avaliação, joga esta seed com janela')
+    parser.add_argument('--render-fps', type=int, default=60,
+                        help='limite de frames por segundo da janela (0 = sem limite)')
+    parser.add_argument('--video', help='grava o episódio de --render neste arquivo .mp4')
+    args = parser.parse_args()
+    if args.seeds < 1:
+        parser.error('--seeds precisa ser pelo menos 1')
+
+    config = load_config(args.config)
+    named = load_genomes(args.genomes)
+    names = [name for name, _ in named]
+    genomes = [genome for _, genome in named]
+    seeds = np.arange(args.first_seed, args.first_seed + args.seeds)
+    fitness, ticks, score = evaluate_seeds(genomes, config, seeds, args.workers or os.cpu_count(),
+                                           args.max_steps)
+
+    report = {name: summarize(fitness[i], ticks[i], score[i]) for i, name in enumerate(names)}
+    print(f"{len(seeds)} seeds ({seeds[0]}..{seeds[-1]})\n")
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nEstatísticas salvas em {args.output}")
+
+    if args.render is not None:
+        render_seed(genomes, config, args.render, args.render_fps, args.video)
@@ -0,0 +1,418 @@
+import math
+import hashlib
+import multiprocessing
+import random
+import time
+from collections import OrderedDict
+from multiprocessing import resource_tracker
+import neat
+from neat.graphs import required_for_output
+import numpy as np
+from dino import DinoGame
+from difficulty import Difficulty
+from batch_net import BatchNetwork, SharedNetworks, attach_networks
+from novelty import BehaviorRecorder, task_fitness
+from profiling import timer
+from sections import read_section
+
+class EvalConfig:
+    """
+    Parâmetros dos episódios de avaliação (seção [DinoEval] do arquivo do NEAT).
+
+    - max_steps: ticks máximos por episódio (0 = sem limite)
+    - max_seconds: tempo real máximo por episódio (0 = sem limite); torna o
+      resultado dependente da velocidade da máquina
+    - stop_on_threshold: encerra o episódio assim que o critério de fitness
+      (fitness_criterion) atinge fitness_threshold
+    - cull_after_steps: a partir deste tick (0 = desligado), a cada
+      cull_interval ticks, elimina os dinos vivos com fitness abaixo de
+      cull_fraction vezes o melhor fitness
+    - stop_on_threshold e o corte dependem do fitness de toda a população,
+      então ficam desligados na avaliação em lotes do ParallelEvaluator
+    - episode_seed: seed dos episódios de treino (-1 = uma nova por geração)
+    - fitness_cache_size: entradas do FitnessCache (0 = sem cache)
+    - novelty_weight: peso da novidade somada ao fitness (0 = sem busca por
+      novidade); novelty_k, novelty_archive_size e novelty_archive_add
+      configuram o NoveltySearch
+    """
+    __params = [('max_steps', int, 0),
+                ('max_seconds', float, 0.0),
+                ('stop_on_threshold', bool, True),
+                ('cull_after_steps', int, 0),
+                ('cull_interval', int, 100),
+                ('cull_fraction', float, 0.5),
+                ('episode_seed', int, -1),
+                ('fitness_cache_size', int, 0),
+                ('novelty_weight', float, 0.0),
+                ('novelty_k', int, 15),
+                ('novelty_archive_size', int, 1000),
+                ('novelty_archive_add', int, 5)]
+
+    def __init__(self, **kwargs):
+        for name, kind, default in self.__params:
+            setattr(self, name, kind(kwargs.pop(name, default)))
+        if kwargs:
+            raise TypeError(f"Parâmetros desconhecidos: {', '.join(kwargs)}")
+        if self.cull_interval < 1:
+            raise RuntimeError(f"cull_interval deve ser positivo, não {self.cull_interval}")
+        if not 0 <= self.cull_fraction <= 1:
+            raise RuntimeError(f"cull_fraction deve estar entre 0 e 1, não {self.cull_fraction}")
+
+    @classmethod
+    def parse(cls, filename, section='DinoEval'):
+        """Lê a seção do arquivo de configuração; itens ausentes usam o padrão"""
+        return cls(**read_section(filename, section, cls.__params))
+
+class DinoConfig(neat.Config):
+    """
+    neat.Config com os parâmetros de avaliação da seção [DinoEval] em .eval
+    e as curvas de dificuldade da seção [DinoDifficulty] em .difficulty
+    """
+    def __init__(self, filename):
+        super().__init__(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation, filename)
+        self.eval = EvalConfig.parse(filename)
+        self.difficulty = Difficulty.parse(filename)
+
+def load_config(filename):
+    """Carrega a configuração do NEAT (com a seção [DinoEval])"""
+    return DinoConfig(filename)
+
+class EpisodeBudget:
+    """
+    Aplica os limites de EvalConfig a um episódio em andamento.
+
+    exhausted() é chamado a cada tick: elimina os dinos sem chance (se
+    configurado) e diz se o episódio deve terminar antes de todos morrerem.
+    Com partial=True o episódio tem só parte da população (um lote): a parada
+    pelo critério de fitness e o corte, que comparam os dinos entre si, ficam
+    desligados, para o fitness não depender de como a população foi dividida.
+    """
+    def __init__(self, config, partial=False):
+        self.eval = getattr(config, 'eval', None) or EvalConfig()
+        self.partial = partial
+        self.threshold = None
+        if self.eval.stop_on_threshold and not config.no_fitness_termination and not partial:
+            self.threshold = config.fitness_threshold
+            self.criterion = {'max': np.max, 'min': np.min, 'mean': np.mean}[config.fitness_criterion]
+        self.start = time.perf_counter()
+
+    def exhausted(self, game):
+        ev = self.eval
+        dinos = game.dinos
+        if ev.max_steps and game.ticks >= ev.max_steps:
+            return True
+        if ev.max_seconds and time.perf_counter() - self.start >= ev.max_seconds:
+            return True
+        # O fitness nunca diminui, então o valor atual já garante o critério
+        if self.threshold is not None and dinos.size and self.criterion(dinos.fitness) >= self.threshold:
+            return True
+        if (ev.cull_after_steps and not self.partial and game.ticks >= ev.cull_after_steps
+                and game.ticks % ev.cull_interval == 0 and dinos.alive.any()):
+            best = dinos.fitness.max()
+            dinos.alive &= dinos.fitness >= ev.cull_fraction * best
+        return False
+
+def genome_hash(genome, config):
+    """
+    Hash canônico da parte do genoma que afeta a rede.
+
+    Considera só as conexões habilitadas que chegam a nós necessários para as
+    saídas, com seus pesos, e o bias, response, ativação e agregação desses
+    nós; a chave do genoma e os genes desligados ou inúteis não entram. Dois
+    genomas com o mesmo hash produzem as mesmas ações.
+    """
+    gc = config.genome_config
+    connections = sorted((key, conn.weight) for key, conn in genome.connections.items()
+                         if conn.enabled)
+    required = required_for_output(gc.input_keys, gc.output_keys, [key for key, _ in connections])
+    connections = [(key, weight) for key, weight in connections if key[1] in required]
+    nodes = sorted((key, node.bias, node.response, node.activation, node.aggregation)
+                   for key, node in genome.nodes.items() if key in required)
+    # repr de float é exato, então o texto identifica os valores sem ambiguidade
+    return hashlib.blake2b(repr((connections, nodes)).encode(), digest_size=16).digest()
+
+class FitnessCache(neat.reporting.BaseReporter):
+    """
+    Cache LRU de fitness por (hash canônico do genoma, seed do episódio,
+    nível de dificuldade). Guarda também o descritor de comportamento do
+    genoma (genome.behavior), se houver.
+
+    Elites e clones reavaliados no mesmo cenário recebem o fitness guardado
+    em vez de jogar o episódio de novo. Supõe que o fitness de um genoma não
+    depende dos outros genomas do lote nem do tempo real; create_fitness_cache
+    não cria o cache quando max_seconds ou o corte de dinos sem chance
+    quebram essa suposição.
+
+    Também é um reporter do NEAT: mostra acertos e faltas de cada geração.
+    """
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def start_generation(self, generation):
+        self.hits = 0
+        self.misses = 0
+
+    def post_evaluate(self, config, population, species, best_genome):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        print(f"Cache de fitness: {self.hits} acertos, {self.misses} faltas ({rate:.0%}), "
+              f"{len(self.entries)} entradas")
+
+    def fill(self, genomes, config, seed):
+        """
+        Atribui o fitness guardado aos genomas encontrados no cache.
+
+        Retorna os (genome_id, genome) que ainda precisam ser avaliados e as
+        chaves para guardá-los depois com store().
+        """
+        pending = []
+        keys = []
+        level = difficulty_level(config)
+        for genome_id, genome in genomes:
+            key = (genome_hash(genome, config), seed, level)
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                pending.append((genome_id, genome))
+                keys.append(key)
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                genome.fitness, behavior = entry
+                if behavior is not None:
+                    genome.behavior = behavior
+        return pending, keys
+
+    def store(self, genomes, keys):
+        """Guarda o fitness dos genomas avaliados (com as chaves de fill())"""
+        for (genome_id, genome), key in zip(genomes, keys):
+            self.entries[key] = (genome.fitness, getattr(genome, 'behavior', None))
+            self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+class Curriculum(neat.reporting.BaseReporter):
+    """
+    Aumenta a dificuldade conforme a população melhora.
+
+    No fim de cada geração em que o melhor fitness chegou a
+    curriculum_fitness, o nível da dificuldade (config.difficulty.level)
+    sobe curriculum_step, até curriculum_max_level. O nível é somado ao
+    progresso do episódio, então os genomas bons começam direto no trecho
+    difícil em vez de gastar ticks no terreno fácil que já dominam. O
+    fitness de níveis diferentes não é comparável. Com a busca por novidade,
+    vale o fitness do jogo (task_fitness), sem a novidade.
+    """
+    def __init__(self):
+        self.best_fitness = None
+
+    def post_evaluate(self, config, population, species, best_genome):
+        self.best_fitness = max(task_fitness(g) for g in population.values())
+
+    def end_generation(self, config, population, species_set):
+        difficulty = config.difficulty
+        if (self.best_fitness is not None and self.best_fitness >= difficulty.curriculum_fitness
+                and difficulty.level < difficulty.curriculum_max_level):
+            difficulty.level = min(difficulty.level + difficulty.curriculum_step,
+                                   difficulty.curriculum_max_level)
+            print(f"Dificuldade: nível {difficulty.level}")
+        self.best_fitness = None
+
+def create_fitness_cache(config, parallel=False):
+    """
+    FitnessCache com fitness_cache_size entradas, ou None.
+
+    Não há cache com fitness_cache_size = 0 nem quando o fitness guardado
+    não valeria para as próximas gerações: com max_seconds (depende do tempo
+    real) ou, fora da avaliação paralela (parallel=False), com o corte de
+    dinos sem chance (depende dos outros genomas do episódio). Nesses casos
+    uma mensagem avisa que o cache foi desligado.
+    """
+    ev = config.eval
+    if ev.fitness_cache_size <= 0:
+        return None
+    reasons = []
+    if ev.max_seconds > 0:
+        reasons.append('max_seconds')
+    if ev.cull_after_steps > 0 and not parallel:
+        reasons.append('cull_after_steps')
+    if reasons:
+        print(f"Cache de fitness desligado: com {' e '.join(reasons)} o fitness de um genoma "
+              f"não se repete entre gerações")
+        return None
+    return FitnessCache(ev.fitness_cache_size)
+
+def difficulty_level(config):
+    """Nível de dificuldade atual da configuração (0 sem a seção [DinoDifficulty])"""
+    return getattr(getattr(config, 'difficulty', None), 'level', 0)
+
+def behavior_recorder(config, size):
+    """BehaviorRecorder para um episódio, se a busca por novidade estiver ligada (senão None)"""
+    ev = getattr(config, 'eval', None)
+    if ev is None or ev.novelty_weight <= 0:
+        return None
+    # Ticks sobrevividos relativos à duração máxima do episódio
+    return BehaviorRecorder(size, len(config.genome_config.output_keys), ev.max_steps or 10000)
+
+def draw_seed(config, rng=random):
+    """Seed do próximo episódio de treino: episode_seed de [DinoEval] ou uma sorteada de rng"""
+    seed = rng.getrandbits(32)
+    episode_seed = getattr(getattr(config, 'eval', None), 'episode_seed', -1)
+    return episode_seed if episode_seed >= 0 else seed
+
+def run_episode(genomes, config, seed=None, schedule=None, max_ticks=None, spectator=None):
+    """
+    Joga um episódio headless com um dino por genoma e retorna o fitness de cada um.
+
+    Os dinos não interagem entre si e a sequência de obstáculos depende só da
+    seed (ou da sequência gravada em schedule), então o fitness de um genoma
+    é o mesmo qualquer que seja o lote em que ele é avaliado. Os limites da
+    seção [DinoEval] (config.eval) são aplicados; com eles, um genoma só é
+    independente do lote se max_seconds, stop_on_threshold e o corte de dinos
+    sem chance não encerrarem o episódio antes. Um Spectator (opcional)
+    recebe snapshots do episódio para mostrar numa janela. Com a busca por
+    novidade ligada, o descritor de comportamento de cada genoma vai para
+    genome.behavior.
+    """
+    with timer.phase('network_creation'):
+        batch = BatchNetwork.create(genomes, config)
+    if spectator is not None:
+        spectator.watch(genomes, config)
+    behavior = behavior_recorder(config, len(batch))
+    fitness = run_networks(batch, config, seed, schedule, max_ticks, spectator, behavior)
+    if behavior is not None:
+        for genome, descriptor in zip(genomes, behavior.descriptors()):
+            genome = genome[1] if isinstance(genome, tuple) else genome
+            genome.behavior = descriptor
+    return [float(f) for f in fitness]
+
+def run_networks(batch, config, seed=None, schedule=None, max_ticks=None, spectator=None,
+                 behavior=None, partial=False):
+    """
+    Como run_episode, com as redes já compiladas; retorna o vetor de fitness
+    (NumPy). partial=True indica um lote com só parte da população (ver
+    EpisodeBudget).
+    """
+    game = DinoGame(num_dinos=len(batch), headless=True, seed=seed, schedule=schedule,
+                    timer=timer, difficulty=getattr(config, 'difficulty', None))
+    play_episode(game, batch, max_ticks, budget=EpisodeBudget(config, partial),
+                 spectator=spectator, behavior=behavior)
+    return game.dinos.fitness.copy()
+
+def play_episode(game, batch, max_ticks=None, actions_log=None, budget=None, spectator=None,
+                 behavior=None):
+    """
+    Joga um episódio em game com as redes de batch (uma por dino).
+
+    Termina quando todos os dinos morrem, após max_ticks passos ou quando o
+    EpisodeBudget (opcional) se esgota. Se actions_log for uma lista, recebe
+    uma cópia das ações de cada passo; spectator.observe é chamado após
+    cada passo e behavior.observe (BehaviorRecorder), antes.
+    """
+    state = game.reset()
+    done = budget is not None and budget.exhausted(game)
+    actions = np.zeros(game.num_dinos, dtype=np.int64)
+    while not done and (max_ticks is None or game.ticks < max_ticks):
+        actions[:] = 0  # Ação neutra para dinos mortos
+        alive = np.flatnonzero(game.dinos.alive)
+        with game.timer.phase('activation'):
+            actions[alive] = batch.actions(state[alive], rows=alive)
+        if actions_log is not None:
+            actions_log.append(actions.copy())
+        if behavior is not None:
+            behavior.observe(game, actions, alive)
+        state, reward, done = game.step(actions)
+        if spectator is not None:
+            spectator.observe(game, state, actions)
+        if budget is not None and not done:
+            done = budget.exhausted(game)
+    return game
+
+def _evaluate_shared(spec, start, stop, config, seed):
+    """
+    Tarefa executada nos processos do pool; devolve o fitness, os descritores
+    de comportamento (None sem busca por novidade) e os tempos por fase
+    """
+    timer.reset()
+    shm, batch = attach_networks(spec, start, stop)
+    behavior = behavior_recorder(config, len(batch))
+    try:
+        fitness = run_networks(batch, config, seed, behavior=behavior, partial=True)
+    finally:
+        del batch  # Os tensores apontam para o bloco
+        shm.close()
+    return fitness, behavior and behavior.descriptors(), timer.snapshot()
+
+class ParallelEvaluator:
+    """
+    Avalia a população em paralelo num pool de processos.
+
+    As redes da geração são compiladas uma vez, num bloco de memória
+    compartilhada (SharedNetworks), e divididas em lotes; cada processo joga
+    o episódio do seu lote num DinoGame headless próprio, ativando as redes
+    direto no bloco, e devolve só o vetor de fitness. Todos os lotes de uma
+    geração usam a mesma seed, sorteada de um gerador próprio do avaliador,
+    e cada dino observa só o próprio estado, então o resultado não depende
+    do número de processos nem do tamanho dos lotes: stop_on_threshold e o
+    corte de dinos sem chance, que dependem dos outros dinos do episódio,
+    não se aplicam aos lotes (ver EpisodeBudget). Com episode_seed em
+    [DinoEval], a seed é sempre a mesma; com um FitnessCache, os genomas já
+    avaliados naquela seed não são enviados aos processos.
+
+    Uso: population.run(evaluator.evaluate, n)
+    """
+    def __init__(self, num_workers=None, batch_size=None, seed=None, cache=None):
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.cache = cache
+        # Os processos usam o resource tracker deste processo: os blocos que
+        # eles abrem não são tratados como vazamentos quando eles terminam
+        resource_tracker.ensure_running()
+        self.pool = multiprocessing.Pool(self.num_workers)
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """Encerra o pool de processos"""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def evaluate(self, genomes, config):
+        """Função de fitness no formato esperado por neat.Population.run"""
+        seed = draw_seed(config, self.rng)
+        if self.cache is not None:
+            genomes, keys = self.cache.fill(genomes, config, seed)
+
+        if genomes:
+            self._evaluate(genomes, config, seed)
+        if self.cache is not None:
+            self.cache.store(genomes, keys)
+
+    def _evaluate(self, genomes, config, seed):
+        # Alguns lotes por processo para equilibrar a carga
+        batch_size = self.batch_size or max(1, math.ceil(len(genomes) / (self.num_workers * 4)))
+        starts = range(0, len(genomes), batch_size)
+        with timer.phase('network_creation'):
+            networks = SharedNetworks(BatchNetwork.create(genomes, config))
+        try:
+            jobs = [self.pool.apply_async(_evaluate_shared, (networks.spec, start, start + batch_size,
+                                                             config, seed))
+                    for start in starts]
+            for start, job in zip(starts, jobs):
+                fitness, behaviors, (totals, ticks) = job.get()
+                for j, (genome_id, genome) in enumerate(genomes[start:start + batch_size]):
+                    genome.fitness = float(fitness[j])
+                    if behaviors is not None:
+                        genome.behavior = behaviors[j]
+                # Tempo somado dos processos (CPU gasto, não tempo de parede)
+                timer.add(totals, ticks)
+        finally:
+            networks.close()
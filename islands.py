@@ -0,0 +1,229 @@
+import os
+import multiprocessing
+import pickle
+import queue
+import random
+from itertools import count
+import neat
+from evaluation import Curriculum, create_fitness_cache, draw_seed, load_config, run_episode
+from checkpoint import TrainingCheckpointer, latest_checkpoint, restore_checkpoint
+from novelty import NoveltySearch
+from telemetry import TelemetryReporter
+
+class Island(neat.reporting.BaseReporter):
+    """
+    Uma ilha do modelo de ilhas: avalia a própria população e troca migrantes.
+
+    É a função de fitness da população (evaluate) e um reporter do NEAT. A
+    cada `interval` gerações, depois de avaliar a população, envia cópias dos
+    seus `migrants` melhores genomas para a próxima ilha do anel (outbox),
+    recebe os da ilha anterior (inbox), avalia-os no mesmo episódio da
+    geração e coloca-os no lugar dos piores genomas locais. Só os migrantes
+    passam pelas filas, nunca a população inteira. O contador de nós da ilha
+    passa a seguir o maior id de nó dos migrantes, para que os descendentes
+    não recebam ids que eles já têm.
+
+    O coordenador recebe pela fila `results` o melhor fitness de cada geração
+    e o melhor genoma da ilha sempre que ele melhora. Com um NoveltySearch
+    (novelty), a novidade é somada depois da migração, já com os migrantes.
+    """
+    def __init__(self, index, population, inbox, outbox, results, stop, interval=5, migrants=2,
+                 novelty=None):
+        self.index = index
+        self.population = population
+        self.inbox = inbox
+        self.outbox = outbox
+        self.results = results
+        self.stop = stop
+        self.interval = max(1, interval)
+        self.migrants = migrants
+        self.novelty = novelty
+        self.generation = None
+        self.best_fitness = None
+        self.neighbor_done = False
+        self.cache = create_fitness_cache(population.config)
+
+    def start_generation(self, generation):
+        self.generation = generation
+
+    def post_evaluate(self, config, population, species, best_genome):
+        if self.best_fitness is None or best_genome.fitness > self.best_fitness:
+            self.best_fitness = best_genome.fitness
+            self.results.put(('best', self.index, self.generation, best_genome))
+        self.results.put(('generation', self.index, self.generation, best_genome.fitness))
+
+    def found_solution(self, config, generation, best):
+        # As outras ilhas param no fim do ciclo de migração atual
+        self.stop.set()
+
+    def evaluate(self, genomes, config):
+        """Função de fitness no formato esperado por neat.Population.run"""
+        seed = draw_seed(config)
+        self._evaluate(genomes, config, seed)
+        if self.migrants > 0 and self.generation > 0 and self.generation % self.interval == 0:
+            self._migrate(genomes, config, seed)
+        if self.novelty is not None:
+            self.novelty.score(list(self.population.population.values()))
+
+    def finish(self):
+        """Avisa a próxima ilha que não virão mais migrantes"""
+        self.outbox.put(None)
+
+    def _evaluate(self, genomes, config, seed):
+        if self.cache is not None:
+            genomes, keys = self.cache.fill(genomes, config, seed)
+        fitnesses = run_episode(genomes, config, seed)
+        for (genome_id, genome), fitness in zip(genomes, fitnesses):
+            genome.fitness = fitness
+        if self.cache is not None:
+            self.cache.store(genomes, keys)
+
+    def _migrate(self, genomes, config, seed):
+        """Envia os melhores genomas e troca os piores pelos recebidos"""
+        ranked = sorted((g for _, g in genomes), key=lambda g: g.fitness, reverse=True)
+        self.outbox.put(ranked[:self.migrants])
+        if self.neighbor_done:
+            return
+        incoming = self.inbox.get()
+        if incoming is None:
+            self.neighbor_done = True
+            return
+
+        # Os nós ocultos dos migrantes têm ids do contador da outra ilha: o
+        # contador local passa a seguir o maior id, para não repeti-los
+        gc = config.genome_config
+        top = max(key for g in [*incoming, *self.population.population.values()] for key in g.nodes)
+        next_key = next(gc.node_indexer) if gc.node_indexer is not None else 0
+        gc.node_indexer = count(max(next_key, top + 1))
+
+        # Os migrantes jogam o mesmo episódio que a população local
+        self._evaluate([(g.key, g) for g in incoming], config, seed)
+        p = self.population
+        for old, new in zip(reversed(ranked), incoming):
+            new.key = old.key
+            p.population[old.key] = new
+            species_id = p.species.genome_to_species[old.key]
+            p.species.species[species_id].members[old.key] = new
+
+def _island_main(index, config_file, generations, interval, migrants, seed, inbox, outbox, results,
+                 stop, checkpoint_dir, checkpoint_every, keep_checkpoints, resume):
+    """Processo de uma ilha: evolui a própria população até o fim ou até stop"""
+    random.seed(seed)
+    config = load_config(config_file)
+    island_dir = os.path.join(checkpoint_dir, f'island_{index}')
+    checkpoint = latest_checkpoint(island_dir) if resume else None
+    if checkpoint is not None:
+        p = restore_checkpoint(checkpoint, config)
+    else:
+        p = neat.Population(config)
+    novelty = None
+    if config.eval.novelty_weight > 0:
+        # Cada ilha tem o próprio arquivo de comportamentos; a novidade vai
+        # para o log da ilha, sem mensagens no console
+        novelty = NoveltySearch(config.eval.novelty_weight, config.eval.novelty_k,
+                                config.eval.novelty_archive_size, config.eval.novelty_archive_add)
+    island = Island(index, p, inbox, outbox, results, stop, interval, migrants, novelty)
+    p.add_reporter(island)
+    telemetry = TelemetryReporter(f'training_log_island_{index}.jsonl', plot_every=0,
+                                  resume_from=p.generation if checkpoint is not None else None)
+    p.add_reporter(telemetry)
+    if config.difficulty.curriculum:
+        p.add_reporter(Curriculum())
+    checkpointer = None
+    if checkpoint_every > 0:
+        checkpointer = TrainingCheckpointer(island_dir, checkpoint_every, keep_checkpoints)
+        checkpointer.attach(p)
+    try:
+        # Ciclos de `interval` gerações; stop só é verificado entre ciclos
+        while p.generation < generations and not stop.is_set():
+            p.run(island.evaluate, min(interval, generations - p.generation))
+    finally:
+        island.finish()
+        telemetry.close()
+        if checkpointer is not None:
+            checkpointer.close()
+        results.put(('done', index, p.generation, None))
+
+def run_islands(config_file, num_islands=None, generations=50, migration_interval=5, migrants=2,
+                seed=None, checkpoint_dir='checkpoints', checkpoint_every=5, keep_checkpoints=3,
+                resume=False):
+    """
+    Executa o NEAT no modelo de ilhas, uma população por processo.
+
+    Cada ilha evolui uma população completa (pop_size da configuração) num
+    processo próprio, sem janela, e a cada migration_interval gerações envia
+    os seus `migrants` melhores genomas para a próxima ilha de um anel (ver
+    Island). O processo principal é o coordenador:
+    - Mostra o melhor fitness de cada ilha a cada geração
+    - Guarda o melhor genoma global em best_genome.pkl sempre que ele melhora
+    - Para todas as ilhas quando uma atinge fitness_threshold
+
+    Cada ilha grava as métricas em training_log_island_N.jsonl e os próprios
+    checkpoints em checkpoint_dir/island_N. Com resume=True cada ilha
+    continua do seu checkpoint mais recente (migrantes em trânsito não são
+    salvos) e o melhor global parte do best_genome.pkl existente.
+
+    Retorna o melhor genoma global.
+    """
+    num_islands = num_islands or multiprocessing.cpu_count()
+    if seed is None:
+        seed = random.getrandbits(32)
+    inboxes = [multiprocessing.Queue() for _ in range(num_islands)]
+    results = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    processes = []
+    for i in range(num_islands):
+        process = multiprocessing.Process(
+            target=_island_main,
+            args=(i, config_file, generations, migration_interval, migrants, seed + i, inboxes[i],
+                  inboxes[(i + 1) % num_islands], results, stop, checkpoint_dir, checkpoint_every,
+                  keep_checkpoints, resume),
+            daemon=True)
+        process.start()
+        processes.append(process)
+
+    best = None
+    if resume and os.path.exists('best_genome.pkl'):
+        with open('best_genome.pkl', 'rb') as f:
+            best = pickle.load(f)
+    running = set(range(num_islands))
+    reported = {}  # geração -> {ilha: melhor fitness}
+    while running:
+        kind, index, generation, value = results.get()
+        if kind == 'generation':
+            reported.setdefault(generation, {})[index] = value
+        elif kind == 'best':
+            if best is None or value.fitness > best.fitness:
+                best = value
+                _save_genome(best, 'best_genome.pkl')
+                print(f"Ilha {index}, geração {generation}: novo melhor global {best.fitness:.2f}")
+        else:
+            running.discard(index)
+        # Uma linha por geração, quando todas as ilhas ainda ativas a terminaram
+        for generation in sorted(reported):
+            if not running.issubset(reported[generation]):
+                break
+            islands = reported.pop(generation)
+            ranking = ' '.join(f'{i}:{islands[i]:.1f}' for i in sorted(islands))
+            print(f"Geração {generation}: melhor por ilha [{ranking}] | "
+                  f"melhor global {best.fitness:.2f}")
+
+    # Migrantes enviados a ilhas que já terminaram ficam nas filas; esvaziá-las
+    # deixa os processos gravarem o que falta e saírem
+    for process in processes:
+        while process.is_alive():
+            for inbox in inboxes:
+                try:
+                    while True:
+                        inbox.get_nowait()
+                except queue.Empty:
+                    pass
+            process.join(0.1)
+    return best
+
+def _save_genome(genome, path):
+    """Grava o genoma de forma atômica (arquivo temporário renomeado)"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(genome, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,193 @@
+import heapq
+import neat
+import numpy as np
+
+class BehaviorRecorder:
+    """
+    Resume o comportamento de cada dino num episódio (descritor de comportamento).
+
+    observe() é chamado antes de cada passo com as ações dos dinos vivos e
+    conta quantas vezes cada dino escolheu cada ação em cada situação: sem
+    obstáculo, obstáculo no chão ou obstáculo flutuante (o mais próximo, com
+    o mesmo critério de DinoGame._calculate_reward). O descritor é o
+    histograma de ações de cada situação (frações) seguido dos ticks
+    sobrevividos divididos por ticks_scale.
+    """
+    SITUATIONS = 3
+
+    def __init__(self, size, num_actions=3, ticks_scale=10000):
+        self.counts = np.zeros((size, self.SITUATIONS, num_actions), dtype=np.int64)
+        self.ticks_scale = ticks_scale
+
+    def observe(self, game, actions, alive):
+        """Conta as ações dos dinos em alive (índices) no tick atual"""
+        if not game.obstacles:
+            situation = 0
+        elif game.obstacles.front()[1] < game.height - 100:
+            situation = 2  # Flutuante
+        else:
+            situation = 1  # No chão
+        self.counts[alive, situation, actions[alive]] += 1
+
+    def descriptors(self):
+        """Descritores (dinos, situações * ações + 1)"""
+        totals = self.counts.sum(axis=2, keepdims=True)
+        histogram = self.counts / np.maximum(totals, 1)
+        ticks = self.counts.sum(axis=(1, 2)) / self.ticks_scale
+        size, situations, actions = self.counts.shape
+        return np.concatenate([histogram.reshape(size, situations * actions), ticks[:, None]], axis=1)
+
+def task_fitness(genome):
+    """Fitness do genoma no jogo, sem a novidade somada pelo NoveltySearch"""
+    return getattr(genome, 'task_fitness', genome.fitness)
+
+class KDTree:
+    """
+    Árvore k-d para buscar os k vizinhos mais próximos (distância euclidiana).
+
+    Cada nó divide os pontos na mediana da dimensão de maior amplitude; as
+    folhas guardam até leaf_size pontos, contíguos em self.points. A busca
+    desce primeiro pelo lado do ponto consultado e só visita o outro lado
+    quando o plano de corte está mais perto que o k-ésimo vizinho já
+    encontrado, então cada consulta visita poucas folhas (em média
+    O(log n)) em vez de comparar com todos os pontos.
+    """
+    def __init__(self, points, leaf_size=32):
+        points = np.asarray(points, dtype=np.float64)
+        self.leaf_size = leaf_size
+        self.order = np.arange(len(points))
+        self.source = points
+        # Nós em listas paralelas; dim = -1 nas folhas
+        self.dim, self.split, self.left, self.right, self.start, self.stop = [], [], [], [], [], []
+        self._build(0, len(points))
+        self.points = points[self.order]
+        del self.source
+
+    def __len__(self):
+        return len(self.points)
+
+    def _build(self, start, stop):
+        node = len(self.dim)
+        for field in (self.dim, self.split, self.left, self.right, self.start, self.stop):
+            field.append(-1)
+        self.start[node], self.stop[node] = start, stop
+        if stop - start <= self.leaf_size:
+            return node
+        rows = self.order[start:stop]
+        values = self.source[rows]
+        spread = values.max(axis=0) - values.min(axis=0)
+        dim = int(np.argmax(spread))
+        if spread[dim] == 0:
+            return node  # Pontos iguais: uma folha só
+        mid = (start + stop) // 2
+        partition = np.argpartition(values[:, dim], mid - start)
+        self.order[start:stop] = rows[partition]
+        self.dim[node] = dim
+        self.split[node] = self.source[self.order[mid], dim]
+        self.left[node] = self._build(start, mid)
+        self.right[node] = self._build(mid, stop)
+        return node
+
+    def query(self, points, k):
+        """Distâncias aos k vizinhos mais próximos de cada ponto, em ordem crescente, formato (n, k)"""
+        points = np.asarray(points, dtype=np.float64)
+        k = min(k, len(self.points))
+        distances = np.empty((len(points), k))
+        for i, point in enumerate(points):
+            distances[i] = self._query(point, k)
+        return distances
+
+    def _query(self, point, k):
+        heap = []  # Quadrados das distâncias, negativos (heap de máximo com k itens)
+        # (nó, limite inferior do quadrado da distância, distância à região por dimensão)
+        stack = [(0, 0.0, np.zeros(len(point)))]
+        while stack:
+            node, bound, offset = stack.pop()
+            if len(heap) == k and bound >= -heap[0]:
+                continue
+            dim = self.dim[node]
+            if dim < 0:
+                leaf = self.points[self.start[node]:self.stop[node]] - point
+                for value in np.einsum('ij,ij->i', leaf, leaf).tolist():
+                    if len(heap) < k:
+                        heapq.heappush(heap, -value)
+                    elif value < -heap[0]:
+                        heapq.heapreplace(heap, -value)
+                continue
+            diff = point[dim] - self.split[node]
+            near, far = (self.left[node], self.right[node]) if diff < 0 else (self.right[node], self.left[node])
+            # Do lado distante, a distância nesta dimensão passa a ser a do plano de corte
+            far_bound = bound - offset[dim] ** 2 + diff * diff
+            if len(heap) < k or far_bound < -heap[0]:
+                far_offset = offset.copy()
+                far_offset[dim] = diff
+                # Fica na pilha por baixo: só é visitado depois do lado próximo
+                stack.append((far, far_bound, far_offset))
+            stack.append((near, bound, offset))
+        return np.sqrt(np.sort(-np.array(heap)))
+
+class NoveltySearch(neat.reporting.BaseReporter):
+    """
+    Busca por novidade: soma ao fitness o quão diferente é o comportamento.
+
+    A novidade de um genoma é a distância média do seu descritor de
+    comportamento (genome.behavior, ver BehaviorRecorder) aos k mais próximos
+    entre os da geração atual e os de um arquivo limitado a archive_size
+    comportamentos. Os vizinhos são buscados numa KDTree, então o custo
+    cresce devagar com o arquivo. O fitness passa a ser fitness + weight *
+    novidade (a novidade fica em genome.novelty e o fitness do jogo, sem a
+    novidade, em genome.task_fitness; ver task_fitness), e a cada geração os
+    `add_per_generation` comportamentos mais novos entram no arquivo,
+    substituindo os mais antigos quando ele está cheio.
+
+    Uso: population.run(novelty.wrap(fitness_function), n); também é um
+    reporter do NEAT que mostra a novidade de cada geração.
+    """
+    def __init__(self, weight, k=15, archive_size=1000, add_per_generation=5):
+        self.weight = weight
+        self.k = k
+        self.archive_size = archive_size
+        self.add_per_generation = add_per_generation
+        self.archive = None
+        self.archive_count = 0
+        self.archive_next = 0
+        self.novelty = None
+
+    def wrap(self, fitness_function):
+        """Função de fitness que avalia com fitness_function e soma a novidade"""
+        def evaluate(genomes, config):
+            fitness_function(genomes, config)
+            self.score([genome for _, genome in genomes])
+        return evaluate
+
+    def score(self, genomes):
+        """Calcula a novidade dos genomas, soma ao fitness e atualiza o arquivo"""
+        behaviors = np.array([genome.behavior for genome in genomes])
+        points = np.concatenate([self.archive[:self.archive_count], behaviors]) \
+            if self.archive is not None else behaviors
+        # O vizinho mais próximo de cada genoma é ele mesmo (distância 0)
+        k = min(self.k, len(points) - 1)
+        if k > 0:
+            self.novelty = KDTree(points).query(behaviors, k + 1)[:, 1:].mean(axis=1)
+        else:
+            self.novelty = np.zeros(len(genomes))
+        for genome, novelty in zip(genomes, self.novelty):
+            genome.novelty = float(novelty)
+            genome.task_fitness = genome.fitness
+            genome.fitness += self.weight * genome.novelty
+        self._archive(behaviors[np.argsort(-self.novelty, kind='stable')[:self.add_per_generation]])
+
+    def _archive(self, behaviors):
+        if self.archive_size <= 0:
+            return
+        if self.archive is None:
+            self.archive = np.zeros((self.archive_size, behaviors.shape[1]))
+        for behavior in behaviors:
+            self.archive[self.archive_next] = behavior
+            self.archive_next = (self.archive_next + 1) % self.archive_size
+            self.archive_count = min(self.archive_count + 1, self.archive_size)
+
+    def post_evaluate(self, config, population, species, best_genome):
+        if self.novelty is not None and len(self.novelty):
+            print(f"Novidade: média {self.novelty.mean():.3f}, máxima {self.novelty.max():.3f}, "
+                  f"arquivo com {self.archive_count} comportamentos")
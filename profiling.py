@@ -0,0 +1,183 @@
+import os
+import csv
+import json
+import resource
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+import neat
+
+# Fases medidas em cada geração
+PHASES = ('network_creation', 'activation', 'physics', 'reward', 'render', 'frame_io')
+
+class PhaseTimer:
+    """
+    Acumula o tempo gasto em cada fase do loop de avaliação.
+
+    Uso:
+        with timer.phase('physics'):
+            ...
+    """
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self.ticks = 0
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def add(self, totals, ticks=0):
+        """Soma tempos medidos em outro lugar (ex.: nos processos do pool)"""
+        for name, seconds in totals.items():
+            self.totals[name] += seconds
+        self.ticks += ticks
+
+    def snapshot(self):
+        return dict(self.totals), self.ticks
+
+    def reset(self):
+        self.totals.clear()
+        self.ticks = 0
+
+class _Phase:
+    __slots__ = ('timer', 'name', 'start')
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.timer.totals[self.name] += time.perf_counter() - self.start
+
+# Timer do processo: o loop do jogo e os avaliadores registram aqui
+timer = PhaseTimer()
+
+def peak_memory_mb():
+    """Pico de memória residente (MB) deste processo e dos processos filhos já encerrados"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # No Linux ru_maxrss está em KB; no macOS, em bytes
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return max(usage, children) / scale
+
+class SamplingProfiler:
+    """
+    Profiler por amostragem da thread principal.
+
+    Uma thread separada olha o frame em execução a cada `interval` segundos e
+    conta as funções encontradas na pilha. O relatório de cada geração vai
+    para profile_samples_gen_XXXX.txt.
+    """
+    def __init__(self, interval=0.005, top=30, output_dir='.'):
+        self.interval = interval
+        self.top = top
+        self.output_dir = output_dir
+        self.samples = Counter()
+        self.total = 0
+        self.thread = None
+        self.running = False
+
+    def start(self):
+        self.samples.clear()
+        self.total = 0
+        self.running = True
+        self.target = threading.main_thread().ident
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+        self.thread.start()
+
+    def stop(self, generation):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        path = os.path.join(self.output_dir, f'profile_samples_gen_{generation:04d}.txt')
+        with open(path, 'w') as f:
+            f.write(f"Amostras: {self.total} (intervalo {self.interval * 1e3:.1f} ms)\n\n")
+            for (filename, line, function), count in self.samples.most_common(self.top):
+                f.write(f"{100 * count / max(1, self.total):6.2f}%  {function} "
+                        f"({os.path.basename(filename)}:{line})\n")
+
+    def _sample(self):
+        while self.running:
+            frame = sys._current_frames().get(self.target)
+            if frame is not None:
+                self.total += 1
+                seen = set()
+                # Conta cada função uma vez por amostra (tempo inclusivo)
+                while frame is not None:
+                    code = frame.f_code
+                    key = (code.co_filename, code.co_firstlineno, code.co_name)
+                    if key not in seen:
+                        seen.add(key)
+                        self.samples[key] += 1
+                    frame = frame.f_back
+            time.sleep(self.interval)
+
+class ProfilingReporter(neat.reporting.BaseReporter):
+    """
+    Reporter do NEAT que registra para onde vai o tempo de cada geração.
+
+    Para cada geração grava o tempo total, o tempo de avaliação dividido em
+    fases (criação das redes, ativação, física, recompensa, renderização e
+    gravação de frames), o tempo de reprodução, o número de ticks simulados e
+    o pico de memória, em profile_timeline.json e profile_timeline.csv
+    (atualizados a cada geração).
+    """
+    def __init__(self, output_dir='.', profiler=None):
+        self.output_dir = output_dir
+        self.profiler = profiler
+        self.timeline = []
+        self.row = None
+        self.generation = None
+        self.generation_start = None
+        self.json_path = os.path.join(output_dir, 'profile_timeline.json')
+        self.csv_path = os.path.join(output_dir, 'profile_timeline.csv')
+
+    def start_generation(self, generation):
+        self.generation = generation
+        self.generation_start = time.perf_counter()
+        self.row = None
+        timer.reset()
+        if self.profiler is not None:
+            self.profiler.start()
+
+    def post_evaluate(self, config, population, species, best_genome):
+        totals, ticks = timer.snapshot()
+        evaluation = time.perf_counter() - self.generation_start
+        self.row = {'generation': self.generation, 'evaluation_s': evaluation}
+        for name in PHASES:
+            self.row[name + '_s'] = totals.get(name, 0.0)
+        self.row['other_s'] = max(0.0, evaluation - sum(totals.get(name, 0.0) for name in PHASES))
+        self.row['ticks'] = ticks
+        self.row['ticks_per_second'] = ticks / evaluation if evaluation > 0 else 0.0
+        if self.profiler is not None:
+            self.profiler.stop(self.generation)
+
+    def end_generation(self, config, population, species_set):
+        self._finish_row()
+
+    def found_solution(self, config, generation, best):
+        # A última geração termina sem end_generation
+        self._finish_row()
+
+    def _finish_row(self):
+        if self.row is None:
+            return
+        total = time.perf_counter() - self.generation_start
+        self.row['reproduction_s'] = total - self.row['evaluation_s']
+        self.row['total_s'] = total
+        self.row['peak_memory_mb'] = peak_memory_mb()
+        self.timeline.append(self.row)
+        self.row = None
+        self._write()
+
+    def _write(self):
+        with open(self.json_path, 'w') as f:
+            json.dump(self.timeline, f, indent=2)
+        with open(self.csv_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(self.timeline[0]))
+            writer.writeheader()
+            writer.writerows(self.timeline)
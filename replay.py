@@ -0,0 +1,142 @@
+import os
+import argparse
+import pickle
+import numpy as np
+from dino import DinoGame
+from batch_net import BatchNetwork
+from evaluation import load_config, play_episode
+
+# Versão do formato dos arquivos de episódio
+EPISODE_VERSION = 1
+
+def record_episode(genomes, config, seed=None, max_ticks=None):
+    """
+    Joga um episódio headless e grava a sequência de obstáculos e as ações.
+
+    Retorna um dicionário com a seed, a sequência de obstáculos (linhas
+    tick, y, altura), as ações de cada passo (ticks x genomas), o fitness
+    final de cada genoma, o número de ticks e a pontuação.
+    """
+    game = DinoGame(num_dinos=len(genomes), headless=True, seed=seed)
+    actions_log = []
+    play_episode(game, BatchNetwork.create(genomes, config), max_ticks, actions_log)
+    return _episode(game, seed, actions_log)
+
+def record_scenario(seed, ticks):
+    """Grava só a sequência de obstáculos de uma seed por um número fixo de ticks"""
+    game = DinoGame(num_dinos=0, headless=True, seed=seed)
+    game.reset()
+    no_actions = np.zeros(0, dtype=np.int64)
+    while game.ticks < ticks:
+        game.step(no_actions)
+    return _episode(game, seed, [])
+
+def _episode(game, seed, actions_log):
+    actions = np.array(actions_log, dtype=np.uint8).reshape(len(actions_log), game.num_dinos)
+    return {
+        'version': EPISODE_VERSION,
+        'seed': -1 if seed is None else seed,
+        'schedule': np.array(game.spawn_log, dtype=np.int64).reshape(-1, 3),
+        'actions': actions,
+        'fitness': game.dinos.fitness.copy(),
+        'ticks': game.ticks,
+        'score': game.score,
+    }
+
+def save_episode(path, episode):
+    """Salva o episódio num arquivo .npz comprimido"""
+    np.savez_compressed(path, **episode)
+
+def load_episode(path):
+    """Carrega um episódio salvo por save_episode"""
+    with np.load(path) as data:
+        episode = {key: data[key] for key in data.files}
+    if int(episode['version']) != EPISODE_VERSION:
+        raise ValueError(f"Versão de episódio não suportada: {int(episode['version'])}")
+    for key in ('version', 'seed', 'ticks', 'score'):
+        episode[key] = int(episode[key])
+    return episode
+
+def replay_actions(episode):
+    """
+    Reproduz as ações gravadas sobre a sequência de obstáculos gravada.
+
+    Retorna o jogo ao fim da reprodução; o fitness, os ticks e a pontuação
+    devem ser idênticos aos gravados.
+    """
+    actions = episode['actions']
+    game = DinoGame(num_dinos=actions.shape[1], headless=True, schedule=episode['schedule'])
+    game.reset()
+    if actions.shape[1] == 0:
+        # Cenário sem dinos (record_scenario): não há ações, só os ticks
+        no_actions = np.zeros(0, dtype=np.int64)
+        while game.ticks < episode['ticks']:
+            game.step(no_actions)
+        return game
+    for step_actions in actions:
+        game.step(step_actions.astype(np.int64))
+    return game
+
+def check_episode(episode):
+    """Retorna True se a reprodução das ações bate exatamente com a gravação"""
+    game = replay_actions(episode)
+    return (np.array_equal(game.dinos.fitness, episode['fitness'])
+            and game.ticks == episode['ticks'] and game.score == episode['score'])
+
+def rescore(genomes, config, episode):
+    """
+    Avalia genomas no cenário gravado (mesma sequência de obstáculos, limitado
+    aos ticks do episódio) e retorna o fitness de cada um.
+    """
+    game = DinoGame(num_dinos=len(genomes), headless=True, schedule=episode['schedule'])
+    play_episode(game, BatchNetwork.create(genomes, config), max_ticks=episode['ticks'])
+    return [float(f) for f in game.dinos.fitness]
+
+def load_genome(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+if __name__ == '__main__':
+    """
+    Grava e reproduz episódios sem janela.
+
+    Exemplos:
+      python replay.py record cenario.npz --seed 1 --ticks 5000
+      python replay.py record episodio.npz --seed 1 --genome best_genome.pkl
+      python replay.py check episodio.npz
+      python replay.py score cenario.npz --genome best_genome.pkl
+    """
+    default_config = os.path.join(os.path.dirname(__file__), 'neat-config.txt')
+    parser = argparse.ArgumentParser(description='Grava e reproduz episódios do Dino')
+    parser.add_argument('command', choices=['record', 'check', 'score'])
+    parser.add_argument('episode', help='arquivo .npz do episódio')
+    parser.add_argument('--genome', help='genoma salvo com pickle (ex.: best_genome.pkl)')
+    parser.add_argument('--config', default=default_config, help='configuração do NEAT')
+    parser.add_argument('--seed', type=int, default=0, help='seed do episódio gravado')
+    parser.add_argument('--ticks', type=int, help='duração máxima do episódio gravado')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        if args.genome:
+            episode = record_episode([load_genome(args.genome)], load_config(args.config),
+                                     args.seed, args.ticks)
+        elif args.ticks:
+            episode = record_scenario(args.seed, args.ticks)
+        else:
+            parser.error('record precisa de --genome ou --ticks')
+        save_episode(args.episode, episode)
+        print(f"Episódio gravado: {episode['ticks']} ticks, {len(episode['schedule'])} obstáculos, "
+              f"pontuação {episode['score']}")
+    elif args.command == 'check':
+        episode = load_episode(args.episode)
+        if check_episode(episode):
+            print("Reprodução idêntica à gravação")
+        else:
+            print("Reprodução DIFERENTE da gravação")
+            raise SystemExit(1)
+    else:
+        if not args.genome:
+            parser.error('score precisa de --genome')
+        episode = load_episode(args.episode)
+        fitness = rescore([load_genome(args.genome)], load_config(args.config), episode)
+        print(f"Fitness no cenário: {fitness[0]:.2f}")
@@ -0,0 +1,31 @@
+from configparser import ConfigParser
+
+def read_section(filename, section, params):
+    """
+    Lê uma seção extra do arquivo de configuração do NEAT.
+
+    params é a lista (nome, tipo, padrão) dos itens da seção. Retorna só os
+    itens presentes, já convertidos: bool aceita os valores do ConfigParser
+    (True, yes, 1...), tuple é uma lista de inteiros separados por espaços e
+    os demais tipos são chamados com o texto. Itens desconhecidos geram
+    RuntimeError; sem a seção, retorna {}.
+    """
+    parameters = ConfigParser()
+    with open(filename) as f:
+        parameters.read_file(f)
+    values = {}
+    if parameters.has_section(section):
+        items = dict(parameters.items(section))
+        known = [name for name, kind, default in params]
+        unknown = [name for name in items if name not in known]
+        if unknown:
+            raise RuntimeError(f"Itens desconhecidos na seção '{section}': {', '.join(unknown)}")
+        for name, kind, default in params:
+            if name in items:
+                if kind is bool:
+                    values[name] = parameters.getboolean(section, name)
+                elif kind is tuple:
+                    values[name] = tuple(int(h) for h in items[name].split())
+                else:
+                    values[name] = kind(items[name])
+    return values
@@ -0,0 +1,111 @@
+import queue
+import threading
+import time
+import neat
+import numpy as np
+import pygame
+from dino import DinoGame
+
+class Spectator(neat.reporting.BaseReporter):
+    """
+    Janela que acompanha o treinamento sem atrasar a simulação.
+
+    A simulação roda sem renderizar (headless) e chama observe() a cada tick;
+    a cada `every` ticks (ou, com every=0, `fps` vezes por segundo de tempo
+    real) é tirado um snapshot do jogo, que uma thread separada desenha com
+    DinoGame.render, incluindo a rede do dino vivo com maior fitness (o líder
+    do episódio). Se a janela ainda estiver ocupada com o snapshot anterior,
+    o novo é descartado: a simulação nunca espera a renderização.
+
+    Também é um reporter do NEAT: mostra a geração atual no título da janela.
+    """
+    def __init__(self, every=0, fps=30):
+        self.every = max(0, every)
+        self.interval = 1.0 / fps if fps else 0.0
+        self.next_time = 0.0
+        self.generation = None
+        self.genomes = None
+        self.config = None
+        self.open = True
+        self.queue = queue.Queue(maxsize=1)
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def start_generation(self, generation):
+        self.generation = generation
+
+    def watch(self, genomes, config):
+        """Define os genomas do episódio que vai começar (um por dino)"""
+        self.genomes = [g[1] if isinstance(g, tuple) else g for g in genomes]
+        self.config = config
+
+    def observe(self, game, state, actions):
+        """Chamado pela simulação a cada tick; barato quando não é hora de mostrar"""
+        if not self.open:
+            return
+        if self.every:
+            if game.ticks % self.every:
+                return
+        else:
+            now = time.perf_counter()
+            if now < self.next_time:
+                return
+            self.next_time = now + self.interval
+        if self.queue.full():
+            return  # A janela ainda está desenhando o snapshot anterior
+        snapshot = game.snapshot()
+        alive = np.flatnonzero(snapshot['alive'])
+        if len(alive) > 0:
+            leader = alive[np.argmax(snapshot['fitness'][alive])]
+            snapshot['leader'] = (leader, state[leader].copy(), int(actions[leader]))
+        try:
+            self.queue.put_nowait(('frame', self.genomes, snapshot))
+        except queue.Full:
+            pass
+
+    def close(self):
+        """Fecha a janela e encerra a thread"""
+        if self.thread is not None:
+            self.open = False
+            self.queue.put(('close', None, None))
+            self.thread.join()
+            self.thread = None
+
+    def _worker(self):
+        """Thread da janela: desenha os snapshots até receber 'close'"""
+        view = None
+        genomes = None
+        nets = {}
+        while True:
+            kind, frame_genomes, snapshot = self.queue.get()
+            if kind == 'close':
+                break
+            if not self.open:
+                continue
+            num_dinos = len(snapshot['alive'])
+            if view is None or view.num_dinos != num_dinos:
+                view = DinoGame(num_dinos=num_dinos, render_fps=0)
+                view.reset()
+            if frame_genomes is not genomes:
+                # Novo episódio: as redes do painel são de outros genomas, e os
+                # painéis já desenhados (que guardam as redes) são descartados
+                genomes = frame_genomes
+                nets = {}
+                view.network_overlays.clear()
+            view.load_snapshot(snapshot)
+
+            net = state = action = None
+            if 'leader' in snapshot and genomes is not None:
+                leader, state, action = snapshot['leader']
+                if leader not in nets:
+                    nets[leader] = neat.nn.FeedForwardNetwork.create(genomes[leader], self.config)
+                net = nets[leader]
+            view.render(net, state, action)
+            pygame.display.set_caption(f"Dino Game - NEAT Evolution (geração {self.generation}, "
+                                       f"tick {snapshot['ticks']})")
+
+            # A janela pode ser fechada sem interromper o treinamento
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.open = False
+                    pygame.display.quit()
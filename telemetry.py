@@ -0,0 +1,227 @@
+import os
+import json
+import time
+import neat
+import numpy as np
+from evaluation import difficulty_level
+from novelty import task_fitness
+from profiling import timer
+
+class TelemetryReporter(neat.reporting.BaseReporter):
+    """
+    Reporter do NEAT que grava as métricas de cada geração num log JSONL.
+
+    A cada geração acrescenta uma linha ao log (training_log.jsonl) com as
+    estatísticas de fitness da população, o número e o tamanho das espécies,
+    o melhor genoma, os tempos de avaliação e total, os ticks simulados por
+    segundo, o nível de dificuldade e a novidade média. As colunas fitness_*
+    são o fitness do jogo; com a busca por novidade, o fitness usado na
+    seleção (com a novidade) vai em selection_fitness_best/_mean (None, como
+    novelty_mean, sem busca por novidade). A linha é gravada assim que a geração termina, então o log de
+    um treinamento interrompido continua utilizável, e nada além da geração
+    atual fica em memória.
+
+    A cada `plot_every` gerações (0 = nunca) o gráfico e o relatório são
+    refeitos a partir do log (ver plot_fitness_history e analyze_learning).
+
+    Com resume_from, o log existente é mantido até a geração anterior a
+    resume_from (as linhas posteriores ao checkpoint são descartadas); sem
+    ele, um log novo é iniciado.
+    """
+    def __init__(self, path='training_log.jsonl', plot_every=5, resume_from=None):
+        self.path = path
+        self.plot_every = plot_every
+        self.record = None
+        self.generation = None
+        self.generation_start = None
+        self.start_ticks = 0
+        if resume_from is not None and os.path.exists(path):
+            _truncate_log(path, resume_from)
+            self.file = open(path, 'a')
+        else:
+            self.file = open(path, 'w')
+
+    def start_generation(self, generation):
+        self.generation = generation
+        self.generation_start = time.perf_counter()
+        self.start_ticks = timer.ticks
+        self.record = None
+
+    def post_evaluate(self, config, population, species, best_genome):
+        evaluation = time.perf_counter() - self.generation_start
+        fitness = np.array([task_fitness(g) for g in population.values()], dtype=np.float64)
+        selection = np.array([g.fitness for g in population.values()], dtype=np.float64)
+        sizes = sorted((len(s.members) for s in species.species.values()), reverse=True)
+        ticks = timer.ticks - self.start_ticks
+        novelty = [g.novelty for g in population.values() if hasattr(g, 'novelty')]
+        self.record = {
+            'generation': self.generation,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'population': len(fitness),
+            'fitness_best': float(fitness.max()),
+            'fitness_mean': float(fitness.mean()),
+            'fitness_min': float(fitness.min()),
+            'fitness_stdev': float(fitness.std()),
+            'species': len(sizes),
+            'species_sizes': sizes,
+            'best_genome_key': best_genome.key,
+            'best_genome_size': [len(best_genome.nodes), len(best_genome.connections)],
+            'evaluation_s': evaluation,
+            'ticks': ticks,
+            'ticks_per_second': ticks / evaluation if evaluation > 0 else 0.0,
+            'difficulty_level': difficulty_level(config),
+            'novelty_mean': float(np.mean(novelty)) if novelty else None,
+            'selection_fitness_best': float(selection.max()) if novelty else None,
+            'selection_fitness_mean': float(selection.mean()) if novelty else None,
+        }
+
+    def end_generation(self, config, population, species_set):
+        self._finish_record()
+
+    def found_solution(self, config, generation, best):
+        # A última geração termina sem end_generation
+        self._finish_record()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def _finish_record(self):
+        if self.record is None:
+            return
+        self.record['total_s'] = time.perf_counter() - self.generation_start
+        self.file.write(json.dumps(self.record) + '\n')
+        self.file.flush()
+        self.record = None
+        if self.plot_every and (self.generation + 1) % self.plot_every == 0:
+            plot_fitness_history(self.path)
+            analyze_learning(self.path)
+
+def read_log(path):
+    """
+    Lê as linhas do log, em ordem.
+
+    Uma última linha incompleta (treinamento interrompido no meio da
+    gravação) é ignorada.
+    """
+    with open(path) as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                return
+
+def load_columns(path, names):
+    """Colunas do log como listas: {nome: [valor de cada geração]} (None se ausente)"""
+    columns = {name: [] for name in names}
+    for record in read_log(path):
+        for name in names:
+            columns[name].append(record.get(name))
+    return columns
+
+def _truncate_log(path, generation):
+    """Reescreve o log só com as gerações anteriores a `generation`"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        for record in read_log(path):
+            if record['generation'] < generation:
+                f.write(json.dumps(record) + '\n')
+    os.replace(tmp_path, path)
+
+def plot_fitness_history(log_path='training_log.jsonl'):
+    """
+    Plota o gráfico da evolução do fitness ao longo das gerações.
+
+    O gráfico mostra:
+    - Fitness médio da população (linha azul)
+    - Melhor fitness encontrado (linha laranja)
+    - Fitness mínimo (linha verde)
+    - Número de espécies (linha roxa)
+    """
+    # Importado aqui: carregar o matplotlib custa caro e só o gráfico o usa
+    import matplotlib.pyplot as plt
+    # Obtém os dados do log do treinamento
+    log = load_columns(log_path, ['generation', 'fitness_best', 'fitness_mean', 'fitness_min',
+                                  'species'])
+    if not log['generation']:
+        return
+    generation = log['generation']
+
+    # Cria o gráfico
+    plt.figure(figsize=(12, 8))
+
+    # Gráfico de fitness
+    plt.subplot(2, 1, 1)
+    plt.plot(generation, log['fitness_best'], 'orange', label='Melhor Fitness')
+    plt.plot(generation, log['fitness_mean'], 'blue', label='Fitness Médio')
+    plt.plot(generation, log['fitness_min'], 'green', label='Fitness Mínimo')
+    plt.title('Evolução do Fitness ao Longo das Gerações')
+    plt.xlabel('Geração')
+    plt.ylabel('Fitness')
+    plt.grid(True)
+    plt.legend()
+
+    # Gráfico de espécies
+    plt.subplot(2, 1, 2)
+    plt.plot(generation, log['species'], 'purple', label='Número de Espécies')
+    plt.title('Evolução do Número de Espécies')
+    plt.xlabel('Geração')
+    plt.ylabel('Número de Espécies')
+    plt.grid(True)
+    plt.legend()
+
+    plt.tight_layout()
+    plt.savefig('fitness_evolution.png')
+    plt.close()
+
+def analyze_learning(log_path='training_log.jsonl'):
+    """
+    Analisa o aprendizado das espécies e gera um relatório.
+    """
+    # Calcula métricas de aprendizado
+    log = load_columns(log_path, ['generation', 'fitness_best', 'fitness_mean', 'species',
+                                  'novelty_mean'])
+    if not log['generation']:
+        return
+    best_fitness = log['fitness_best']
+    avg_fitness = log['fitness_mean']
+    num_species = log['species']
+
+    # Calcula taxa de melhoria (indefinida quando o melhor anterior é zero)
+    improvement_rate = []
+    for i in range(1, len(best_fitness)):
+        previous = best_fitness[i-1]
+        if previous != 0:
+            improvement_rate.append((best_fitness[i] - previous) / abs(previous) * 100)
+        else:
+            improvement_rate.append(None)
+
+    # Gera relatório
+    with open('learning_report.txt', 'w') as f:
+        f.write("Relatório de Aprendizado\n")
+        f.write("=======================\n\n")
+
+        f.write(f"Melhor Fitness Final: {best_fitness[-1]:.2f}\n")
+        f.write(f"Fitness Médio Final: {avg_fitness[-1]:.2f}\n")
+        f.write(f"Número Final de Espécies: {num_species[-1]}\n")
+        if log['novelty_mean'][-1] is not None:
+            f.write(f"Novidade Média Final: {log['novelty_mean'][-1]:.3f}\n")
+        f.write("\n")
+
+        f.write("Taxa de Melhoria por Geração:\n")
+        for generation, rate in zip(log['generation'][1:], improvement_rate):
+            if rate is None:
+                f.write(f"Geração {generation}: indefinida (melhor fitness anterior igual a zero)\n")
+            else:
+                f.write(f"Geração {generation}: {rate:.2f}%\n")
+
+        f.write("\nAnálise:\n")
+        if len(best_fitness) > 1 and best_fitness[-1] > best_fitness[-2]:
+            f.write("O aprendizado está progredindo positivamente.\n")
+        else:
+            f.write("O aprendizado pode estar estagnando.\n")
+
+        if num_species[-1] > 1:
+            f.write("Há diversidade genética sendo mantida.\n")
+        else:
+            f.write("A diversidade genética pode estar diminuindo.\n")
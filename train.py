@@ -1,111 +1,23 @@
 import os
+import argparse
+import functools
 import neat
 import pickle
-import pygame
 import time
-import matplotlib.pyplot as plt
 import numpy as np
-from dino import DinoGame
+from dino import DinoGame, load_pygame
+from batch_net import BatchNetwork
+from capture import FrameCapture
+from evaluation import (Curriculum, EpisodeBudget, ParallelEvaluator, behavior_recorder,
+                        create_fitness_cache, draw_seed, load_config, run_episode)
+from checkpoint import TrainingCheckpointer, latest_checkpoint, restore_checkpoint
+from islands import run_islands
+from novelty import NoveltySearch
+from profiling import ProfilingReporter, SamplingProfiler, timer
+from telemetry import TelemetryReporter, analyze_learning, plot_fitness_history
 
-def save_frame(screen, frame_count):
-    """Salva o frame atual em um arquivo PNG"""
-    # Cria a pasta frames se não existir
-    frames_dir = os.path.join(os.path.dirname(__file__), 'frames')
-    os.makedirs(frames_dir, exist_ok=True)
-    
-    # Cria o caminho completo do arquivo
-    frame_path = os.path.join(frames_dir, f'frame_{frame_count:04d}.png')
-    
-    try:
-        pygame.image.save(screen, frame_path)
-    except pygame.error as e:
-        print(f"Erro ao salvar frame: {e}")
-        return False
-    return True
-
-def plot_fitness_history(stats):
-    """
-    Plota o gráfico da evolução do fitness ao longo das gerações.
-    
-    O gráfico mostra:
-    - Fitness médio da população (linha azul)
-    - Melhor fitness encontrado (linha laranja)
-    - Fitness mínimo (linha verde)
-    - Número de espécies (linha roxa)
-    """
-    # Obtém os dados do histórico
-    generation = range(len(stats.most_fit_genomes))
-    best_fitness = [c.fitness for c in stats.most_fit_genomes]
-    avg_fitness = stats.get_fitness_mean()
-    min_fitness = stats.get_fitness_min()
-    num_species = [len(s) for s in stats.get_species_sizes()]
-    
-    # Cria o gráfico
-    plt.figure(figsize=(12, 8))
-    
-    # Gráfico de fitness
-    plt.subplot(2, 1, 1)
-    plt.plot(generation, best_fitness, 'orange', label='Melhor Fitness')
-    plt.plot(generation, avg_fitness, 'blue', label='Fitness Médio')
-    plt.plot(generation, min_fitness, 'green', label='Fitness Mínimo')
-    plt.title('Evolução do Fitness ao Longo das Gerações')
-    plt.xlabel('Geração')
-    plt.ylabel('Fitness')
-    plt.grid(True)
-    plt.legend()
-    
-    # Gráfico de espécies
-    plt.subplot(2, 1, 2)
-    plt.plot(generation, num_species, 'purple', label='Número de Espécies')
-    plt.title('Evolução do Número de Espécies')
-    plt.xlabel('Geração')
-    plt.ylabel('Número de Espécies')
-    plt.grid(True)
-    plt.legend()
-    
-    plt.tight_layout()
-    plt.savefig('fitness_evolution.png')
-    plt.close()
-
-def analyze_learning(stats):
-    """
-    Analisa o aprendizado das espécies e gera um relatório.
-    """
-    # Calcula métricas de aprendizado
-    best_fitness = [c.fitness for c in stats.most_fit_genomes]
-    avg_fitness = stats.get_fitness_mean()
-    num_species = [len(s) for s in stats.get_species_sizes()]
-    
-    # Calcula taxa de melhoria
-    improvement_rate = []
-    for i in range(1, len(best_fitness)):
-        improvement_rate.append((best_fitness[i] - best_fitness[i-1]) / best_fitness[i-1] * 100)
-    
-    # Gera relatório
-    with open('learning_report.txt', 'w') as f:
-        f.write("Relatório de Aprendizado\n")
-        f.write("=======================\n\n")
-        
-        f.write(f"Melhor Fitness Final: {best_fitness[-1]:.2f}\n")
-        f.write(f"Fitness Médio Final: {avg_fitness[-1]:.2f}\n")
-        f.write(f"Número Final de Espécies: {num_species[-1]}\n\n")
-        
-        f.write("Taxa de Melhoria por Geração:\n")
-        for i, rate in enumerate(improvement_rate):
-            f.write(f"Geração {i+1}: {rate:.2f}%\n")
-        
-        f.write("\nAnálise:\n")
-        if improvement_rate[-1] > 0:
-            f.write("O aprendizado está progredindo positivamente.\n")
-        else:
-            f.write("O aprendizado pode estar estagnando.\n")
-        
-        if num_species[-1] > 1:
-            f.write("Há diversidade genética sendo mantida.\n")
-        else:
-            f.write("A diversidade genética pode estar diminuindo.\n")
-
-def eval_genomes(genomes, config):
+def eval_genomes(genomes, config, headless=False, seed=None, capture=None, render_fps=60,
+                 spectator=None, cache=None):
     """
     Função de avaliação dos genomas (redes neurais) da população.
     
@@ -117,62 +29,98 @@ def eval_genomes(genomes, config):
     Parâmetros:
     - genomes: Lista de tuplas (genome_id, genome) contendo os genomas a serem avaliados
     - config: Configuração do NEAT contendo parâmetros da rede neural
+    - headless: Se True, simula sem janela, sem renderização e sem salvar
+      frames, o mais rápido que a CPU permitir
+    - seed: Seed da sequência de obstáculos (None para aleatória)
+    - capture: FrameCapture que recebe os frames renderizados (opcional)
+    - render_fps: Limite de frames por segundo da janela (0 = sem limite)
+    - spectator: Spectator que mostra snapshots da simulação headless numa
+      janela separada (opcional)
+    - cache: FitnessCache com o fitness dos genomas já avaliados (opcional,
+      só no modo headless)
     """
-    game = DinoGame(num_dinos=len(genomes))
-    frame_count = 0
+    if headless:
+        if seed is None:
+            # Seed explícita para que o cache saiba em que cenário cada genoma jogou
+            seed = draw_seed(config)
+        if cache is not None:
+            genomes, keys = cache.fill(genomes, config, seed)
+        fitnesses = run_episode(genomes, config, seed, spectator=spectator)
+        for (genome_id, genome), fitness in zip(genomes, fitnesses):
+            genome.fitness = fitness
+        if cache is not None:
+            cache.store(genomes, keys)
+        return
+    
+    game = DinoGame(num_dinos=len(genomes), seed=seed, timer=timer, render_fps=render_fps,
+                    difficulty=getattr(config, 'difficulty', None))
     
-    # Cria as redes neurais para cada genoma
-    nets = []
+    # Compila as redes neurais de todos os genomas para avaliação em lote
+    with timer.phase('network_creation'):
+        batch = BatchNetwork.create(genomes, config)
     for genome_id, genome in genomes:
-        net = neat.nn.FeedForwardNetwork.create(genome, config)
-        nets.append(net)
         genome.fitness = 0
     
+    # Redes individuais só para o painel de visualização (criadas sob demanda)
+    nets = {}
+    
     # Reseta o jogo para o estado inicial
     state = game.reset()
+    budget = EpisodeBudget(config)  # Limites da seção [DinoEval]
+    behavior = behavior_recorder(config, len(genomes))  # Só com a busca por novidade
     done = False
     
     # Loop principal do jogo
     while not done:
         # Obtém as ações de todos os dinossauros vivos
-        actions = []
-        for i, (genome_id, genome) in enumerate(genomes):
-            if game.dinos[i]['alive']:
-                output = nets[i].activate(state)
-                # Escolhe a ação com maior probabilidade
-                action = output.index(max(output))
-                actions.append(action)
-            else:
-                actions.append(0)  # Ação neutra para dinos mortos
+        actions = np.zeros(len(genomes), dtype=np.int64)  # Ação neutra para dinos mortos
+        alive = np.flatnonzero(game.dinos.alive)
+        if len(alive) > 0:
+            # Escolhe a ação com maior probabilidade, todas as redes de uma vez
+            with timer.phase('activation'):
+                actions[alive] = batch.actions(state[alive], rows=alive)
+        if behavior is not None:
+            behavior.observe(game, actions, alive)
         
         # Executa um passo do jogo
         state, reward, done = game.step(actions)
-        
-        # Atualiza o fitness dos genomas
-        for i, (genome_id, genome) in enumerate(genomes):
-            if game.dinos[i]['alive']:
-                genome.fitness = game.dinos[i]['fitness']
+        if state is None:
+            break  # Janela fechada
+        if not done:
+            done = budget.exhausted(game)
         
         # Renderiza o jogo e a rede neural do primeiro dino vivo
-        for i, dino in enumerate(game.dinos):
-            if dino['alive']:
-                game.render(nets[i], state, actions[i])
-                break
+        alive = np.flatnonzero(game.dinos.alive)
+        if len(alive) > 0:
+            i = alive[0]
+            if i not in nets:
+                with timer.phase('network_creation'):
+                    nets[i] = neat.nn.FeedForwardNetwork.create(genomes[i][1], config)
+            with timer.phase('render'):
+                game.render(nets[i], state[i], actions[i])
         else:
-            game.render()
+            with timer.phase('render'):
+                game.render()
             
-        # Salva o frame
-        if not save_frame(game.screen, frame_count):
-            print(f"Erro ao salvar frame {frame_count}")
-        frame_count += 1
+        # Envia o frame para a gravação em segundo plano
+        if capture is not None:
+            with timer.phase('frame_io'):
+                capture.capture(game.screen)
         
-        # Adiciona um pequeno delay para visualização
-        pygame.time.delay(10)
+    # Atualiza o fitness dos genomas (dinos mortos param de acumular)
+    for i, (genome_id, genome) in enumerate(genomes):
+        genome.fitness = float(game.dinos.fitness[i])
+    if behavior is not None:
+        for (genome_id, genome), descriptor in zip(genomes, behavior.descriptors()):
+            genome.behavior = descriptor
         
     # Fecha o jogo após avaliar todos os genomas
     game.close()
 
-def run_neat(config_file):
+def run_neat(config_file, headless=False, workers=1, capture_policy='every', capture_every=1,
+             sample_profile=False, render_fps=60, spectate=False, spectate_every=0,
+             spectate_fps=30, checkpoint_dir='checkpoints', checkpoint_every=5,
+             keep_checkpoints=3, resume=False, plot_every=5):
     """
     Função principal que executa o algoritmo NEAT.
     
@@ -183,6 +131,44 @@ def run_neat(config_file):
     4. Executar o algoritmo por um número de gerações
     5. Salvar o melhor genoma encontrado
     
+    Com headless=True a avaliação roda sem janela e sem salvar frames.
+    Com workers > 1 a população é avaliada em paralelo (sempre headless)
+    por um pool de processos.
+    
+    No modo com janela os frames são gravados em 'training.mp4' por um
+    FrameCapture, conforme capture_policy ('every', 'best' ou 'off') e
+    capture_every (grava um a cada N frames). render_fps limita os frames por
+    segundo da janela (0 = sem limite, o mais rápido possível).
+    
+    Com spectate=True a simulação roda headless, na velocidade máxima, e uma
+    janela em outra thread mostra um snapshot a cada spectate_every ticks
+    (ou spectate_fps vezes por segundo, se spectate_every for 0).
+    
+    O tempo de cada geração, por fase, vai para profile_timeline.json/.csv;
+    com sample_profile=True um profiler por amostragem também grava as
+    funções mais custosas de cada geração.
+    
+    A cada checkpoint_every gerações (0 = nunca) o estado do treinamento é
+    salvo em checkpoint_dir, mantendo só os keep_checkpoints mais recentes
+    (0 = todos). Com resume=True o treinamento continua do checkpoint mais
+    recente, até completar as 50 gerações.
+    
+    As métricas de cada geração são acrescentadas a training_log.jsonl assim
+    que a geração termina; o gráfico e o relatório são refeitos a partir desse
+    log a cada plot_every gerações (0 = só no fim) e no fim do treinamento.
+    
+    Sem janela, o fitness de genomas repetidos no mesmo cenário sai de um
+    FitnessCache (tamanho em fitness_cache_size, na seção [DinoEval]; ver
+    create_fitness_cache).
+    
+    A velocidade, o intervalo e os tipos de obstáculos seguem a seção
+    [DinoDifficulty]; com curriculum = True, um Curriculum aumenta a
+    dificuldade conforme o melhor fitness melhora.
+    
+    Com novelty_weight > 0 (seção [DinoEval]) um NoveltySearch soma ao
+    fitness a novidade do comportamento de cada genoma em relação à geração
+    e a um arquivo de comportamentos (o arquivo não vai para os checkpoints).
+    
     O processo de treinamento funciona da seguinte forma:
     1. Cria uma população inicial de genomas aleatórios
     2. Para cada geração:
@@ -191,17 +177,57 @@ def run_neat(config_file):
        - Cria uma nova geração através de mutação e crossover
        - Repete o processo até atingir o critério de parada
     """
-    # Carrega a configuração do NEAT
-    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
-                        neat.DefaultSpeciesSet, neat.DefaultStagnation, config_file)
+    # Carrega a configuração do NEAT (com os limites de avaliação de [DinoEval])
+    config = load_config(config_file)
+
+    # Cache de fitness dos genomas repetidos (elites e clones), só sem janela
+    cache = None
+    if headless or workers > 1 or spectate:
+        cache = create_fitness_cache(config, parallel=workers > 1)
+    evaluator = ParallelEvaluator(workers, cache=cache) if workers > 1 else None
 
-    # Cria a população inicial
-    p = neat.Population(config)
+    # Cria a população inicial (ou continua do último checkpoint)
+    checkpoint = latest_checkpoint(checkpoint_dir) if resume else None
+    if checkpoint is not None:
+        print(f"Continuando do checkpoint {checkpoint}")
+        p = restore_checkpoint(checkpoint, config, evaluator=evaluator)
+    else:
+        if resume:
+            print(f"Nenhum checkpoint em {checkpoint_dir}; começando do zero")
+        p = neat.Population(config)
     
     # Adiciona reportes para monitorar o progresso
     p.add_reporter(neat.StdOutReporter(True))  # Mostra progresso no console
-    stats = neat.StatisticsReporter()  # Coleta estatísticas do treinamento
-    p.add_reporter(stats)
+    if cache is not None:
+        p.add_reporter(cache)
+    # Tempo por geração e por fase (ao lado do learning_report.txt)
+    p.add_reporter(ProfilingReporter(profiler=SamplingProfiler() if sample_profile else None))
+    # Métricas de cada geração gravadas em training_log.jsonl (depois do
+    # ProfilingReporter, que zera a contagem de ticks no início da geração)
+    telemetry = TelemetryReporter('training_log.jsonl', plot_every,
+                                  resume_from=p.generation if checkpoint is not None else None)
+    p.add_reporter(telemetry)
+    # Dificuldade crescente conforme o fitness melhora (seção [DinoDifficulty])
+    if config.difficulty.curriculum:
+        p.add_reporter(Curriculum())
+    # Busca por novidade: fitness + novelty_weight * novidade do comportamento
+    novelty = None
+    if config.eval.novelty_weight > 0:
+        novelty = NoveltySearch(config.eval.novelty_weight, config.eval.novelty_k,
+                                config.eval.novelty_archive_size, config.eval.novelty_archive_add)
+        p.add_reporter(novelty)
+    # Checkpoints gravados em segundo plano
+    checkpointer = None
+    if checkpoint_every > 0:
+        checkpointer = TrainingCheckpointer(checkpoint_dir, checkpoint_every, keep_checkpoints,
+                                            evaluator=evaluator)
+        checkpointer.attach(p)
+    generations = max(0, 50 - p.generation)
+
+    def evolve(fitness_function):
+        if novelty is not None:
+            fitness_function = novelty.wrap(fitness_function)
+        return p.run(fitness_function, generations)
 
     # Executa o algoritmo NEAT por 50 gerações
     # O algoritmo irá:
@@ -209,46 +235,47 @@ def run_neat(config_file):
     # 2. Selecionar os melhores
     # 3. Criar uma nova geração
     # 4. Repetir até atingir 50 gerações ou o critério de parada
-    winner = p.run(eval_genomes, 50)
+    try:
+        if evaluator is not None:
+            winner = evolve(evaluator.evaluate)
+        elif spectate:
+            # O módulo da janela (pygame) só no modo que o usa
+            from spectator import Spectator
+            spectator = Spectator(every=spectate_every, fps=spectate_fps)
+            p.add_reporter(spectator)
+            try:
+                winner = evolve(functools.partial(eval_genomes, headless=True, spectator=spectator,
+                                                  cache=cache))
+            finally:
+                spectator.close()
+        elif headless:
+            winner = evolve(functools.partial(eval_genomes, headless=True, cache=cache))
+        else:
+            # Grava o vídeo do treinamento em segundo plano
+            video_path = os.path.join(os.path.dirname(__file__), 'training.mp4')
+            capture = FrameCapture(video_path, policy=capture_policy, every=capture_every)
+            p.add_reporter(capture)
+            try:
+                winner = evolve(functools.partial(eval_genomes, capture=capture,
+                                                  render_fps=render_fps))
+            finally:
+                capture.close()
+    finally:
+        if evaluator is not None:
+            evaluator.close()
+        if checkpointer is not None:
+            checkpointer.close()
+        telemetry.close()
 
     # Salva o melhor genoma encontrado
     with open('best_genome.pkl', 'wb') as f:
         pickle.dump(winner, f)
         
-    # Plota o gráfico da evolução do fitness
-    plot_fitness_history(stats)
+    # Plota o gráfico da evolução do fitness (a partir do log do treinamento)
+    plot_fitness_history(telemetry.path)
     
     # Analisa o aprendizado
-    analyze_learning(stats)
-
-def create_video():
-    """
-    Cria um vídeo a partir dos frames salvos usando ffmpeg.
-    O vídeo será salvo como 'training.mp4' com 30 FPS.
-    """
-    import subprocess
-    
-    # Obtém o caminho da pasta frames
-    frames_dir = os.path.join(os.path.dirname(__file__), 'frames')
-    
-    # Comando ffmpeg para criar o vídeo
-    cmd = [
-        'ffmpeg',
-        '-framerate', '30',  # 30 FPS
-        '-i', os.path.join(frames_dir, 'frame_%04d.png'),  # Padrão dos arquivos de frame
-        '-c:v', 'libx264',  # Codec de vídeo
-        '-pix_fmt', 'yuv420p',  # Formato de pixel
-        '-y',  # Sobrescrever arquivo se existir
-        os.path.join(os.path.dirname(__file__), 'training.mp4')  # Nome do arquivo de saída
-    ]
-    
-    try:
-        subprocess.run(cmd, check=True)
-        print("Vídeo criado com sucesso: training.mp4")
-    except subprocess.CalledProcessError as e:
-        print(f"Erro ao criar vídeo: {e}")
-    except FileNotFoundError:
-        print("ffmpeg não encontrado. Por favor, instale o ffmpeg e adicione ao PATH.")
+    analyze_learning(telemetry.path)
 
 if __name__ == '__main__':
     """
@@ -259,10 +286,75 @@ if __name__ == '__main__':
     1. Criar uma população inicial de redes neurais
     2. Treinar por 50 gerações
     3. Salvar o melhor agente encontrado
-    4. Criar um vídeo do treinamento
+    4. Gravar um vídeo do treinamento (training.mp4)
     5. Gerar gráfico da evolução do fitness
+    
+    Use --headless para treinar sem janela (ex.: em servidores sem display).
     """
-    pygame.init()
-    run_neat(os.path.join(os.path.dirname(__file__), 'neat-config.txt'))
-    create_video()
-    pygame.quit()
+    parser = argparse.ArgumentParser(description='Treina o Dino com NEAT')
+    parser.add_argument('--headless', action='store_true',
+                        help='simula sem janela e sem gravar frames/vídeo')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='processos para avaliar a população em paralelo '
+                             '(0 = todos os núcleos; implica --headless)')
+    parser.add_argument('--capture', choices=FrameCapture.POLICIES, default='every',
+                        help="frames gravados no vídeo: todos ('every'), só gerações que "
+                             "melhoraram o recorde ('best') ou nenhum ('off')")
+    parser.add_argument('--capture-every', type=int, default=1,
+                        help='grava um a cada N frames')
+    parser.add_argument('--sample-profile', action='store_true',
+                        help='amostra a pilha durante cada geração (profile_samples_gen_*.txt)')
+    parser.add_argument('--render-fps', type=int, default=60,
+                        help='limite de frames por segundo da janela (0 = sem limite)')
+    parser.add_argument('--spectate', action='store_true',
+                        help='simula sem renderizar e mostra snapshots numa janela separada')
+    parser.add_argument('--spectate-every', type=int, default=0,
+                        help='mostra um snapshot a cada N ticks (0 = usa --spectate-fps)')
+    parser.add_argument('--spectate-fps', type=float, default=30,
+                        help='snapshots por segundo de tempo real mostrados pelo --spectate')
+    parser.add_argument('--resume', action='store_true',
+                        help='continua do checkpoint mais recente de --checkpoint-dir')
+    parser.add_argument('--checkpoint-dir', default='checkpoints',
+                        help='diretório dos checkpoints')
+    parser.add_argument('--checkpoint-every', type=int, default=5,
+                        help='salva um checkpoint a cada N gerações (0 = nunca)')
+    parser.add_argument('--keep-checkpoints', type=int, default=3,
+                        help='mantém só os K checkpoints mais recentes (0 = todos)')
+    parser.add_argument('--plot-every', type=int, default=5,
+                        help='refaz o gráfico e o relatório a cada N gerações (0 = só no fim)')
+    parser.add_argument('--islands', type=int, default=1,
+                        help='populações evoluindo em processos separados, com migração '
+                             '(0 = uma por núcleo; implica --headless)')
+    parser.add_argument('--migration-interval', type=int, default=5,
+                        help='gerações entre as migrações do modelo de ilhas')
+    parser.add_argument('--migrants', type=int, default=2,
+                        help='melhores genomas enviados por ilha a cada migração')
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count()
+    headless = args.headless or workers > 1
+    islands = args.islands or os.cpu_count()
+    if args.spectate and (headless or islands > 1):
+        parser.error('--spectate precisa de uma janela (sem --headless, --workers ou --islands)')
+    if islands > 1 and workers > 1:
+        parser.error('--islands já usa um processo por ilha; não use com --workers')
+    
+    config_file = os.path.join(os.path.dirname(__file__), 'neat-config.txt')
+    if islands > 1:
+        # Modelo de ilhas: sem janela, uma população por processo
+        run_islands(config_file, islands, migration_interval=args.migration_interval,
+                    migrants=args.migrants, checkpoint_dir=args.checkpoint_dir,
+                    checkpoint_every=args.checkpoint_every,
+                    keep_checkpoints=args.keep_checkpoints, resume=args.resume)
+    else:
+        # Sem janela o pygame nem é carregado
+        pygame = None if headless else load_pygame()
+        run_neat(config_file,
+                 headless=headless, workers=workers,
+                 capture_policy=args.capture, capture_every=args.capture_every,
+                 sample_profile=args.sample_profile, render_fps=args.render_fps,
+                 spectate=args.spectate, spectate_every=args.spectate_every,
+                 spectate_fps=args.spectate_fps, checkpoint_dir=args.checkpoint_dir,
+                 checkpoint_every=args.checkpoint_every, keep_checkpoints=args.keep_checkpoints,
+                 resume=args.resume, plot_every=args.plot_every)
+        if pygame is not None:
+            pygame.quit()
@@ -0,0 +1,281 @@
+import numpy as np
+from dino import DinoGame, DinoPopulation
+from batch_net import BatchNetwork
+
+class ObstacleStream:
+    """
+    Sequência de obstáculos de uma seed, gerada sob demanda.
+
+    Os obstáculos de um DinoGame dependem só da seed (não dos dinos), então
+    um jogo sem dinos gera a mesma sequência que qualquer episódio com essa
+    seed (e da dificuldade). Instâncias com a mesma seed compartilham o mesmo
+    ObstacleStream.
+    """
+    def __init__(self, seed, chunk=600, difficulty=None):
+        self.game = DinoGame(num_dinos=0, headless=True, seed=seed, difficulty=difficulty)
+        self.game.reset()
+        self.chunk = chunk
+
+    def __getitem__(self, i):
+        """Retorna o i-ésimo obstáculo criado (tick, y, altura)"""
+        game = self.game
+        while len(game.spawn_log) <= i:
+            # Avança só o mundo dos obstáculos, como em DinoGame.step
+            for _ in range(self.chunk):
+                game.ticks += 1
+                game._generate_obstacle()
+                game._update_obstacles()
+        return game.spawn_log[i]
+
+class VecDinoEnv:
+    """
+    K instâncias independentes do jogo, um dino em cada, avançadas em lote.
+
+    Interface no estilo Gym:
+        obs = env.reset(seeds)
+        obs, rewards, dones, info = env.step(actions)
+
+    O estado dos dinos fica num DinoPopulation de tamanho K e os obstáculos
+    em arrays (K, capacity), então cada tick custa poucas operações NumPy
+    qualquer que seja K. capacity é só o tamanho inicial: os arrays dobram
+    quando alguma instância tem mais obstáculos na tela (intervalos curtos
+    na dificuldade), como em ObstacleQueue. Física, colisão, recompensa e observação seguem as
+    mesmas regras de DinoGame.step/_calculate_reward/get_state, e a instância
+    com seed s reproduz exatamente o episódio de DinoGame(seed=s) com um dino.
+
+    Com auto_reset=True, as instâncias que terminam recomeçam na mesma seed
+    (o retorno e a duração do episódio encerrado vão em info); com
+    auto_reset=False ficam paradas até o próximo reset. max_ticks limita a
+    duração dos episódios e difficulty define as curvas de dificuldade
+    (padrão: as do jogo original).
+    """
+    def __init__(self, num_envs, auto_reset=True, max_ticks=None, capacity=8, difficulty=None):
+        self.num_envs = num_envs
+        self.auto_reset = auto_reset
+        self.max_ticks = max_ticks
+        self.capacity = capacity
+
+        # Constantes do jogo original
+        game = DinoGame(num_dinos=0, headless=True, difficulty=difficulty)
+        self.width = game.width
+        self.height = game.height
+        self.difficulty = game.difficulty
+        self.speed_table = game.speed_table
+        self.dinos = DinoPopulation(num_envs, game.height - 50, game.dino_height,
+                                    game.dino_crouch_height, game.gravity)
+
+        self.ox = np.zeros((num_envs, capacity))
+        self.oy = np.zeros((num_envs, capacity))
+        self.oh = np.zeros((num_envs, capacity))
+        self.ovalid = np.zeros((num_envs, capacity), dtype=bool)
+        self.speed = np.full(num_envs, game.obstacle_speed)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.ticks = np.zeros(num_envs, dtype=np.int64)
+
+        # Próximo obstáculo de cada instância
+        self.seeds = np.zeros(num_envs, dtype=np.int64)
+        self.spawn_pos = np.zeros(num_envs, dtype=np.int64)
+        self.next_tick = np.zeros(num_envs, dtype=np.int64)
+        self.next_y = np.zeros(num_envs)
+        self.next_h = np.zeros(num_envs)
+        self.streams = {}
+
+        self.episode_returns = np.zeros(num_envs)
+        self.episode_ticks = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self, seeds):
+        """Recomeça todas as instâncias, cada uma com sua seed; retorna as observações"""
+        seeds = np.asarray(seeds, dtype=np.int64)
+        if seeds.shape != (self.num_envs,):
+            raise ValueError(f"Esperadas {self.num_envs} seeds, recebidas {seeds.shape}")
+        self.seeds[:] = seeds
+        self._reset_envs(np.arange(self.num_envs))
+        return self.get_state()
+
+    def _reset_envs(self, envs):
+        d = self.dinos
+        d.y[envs] = d.ground_y
+        d.jump_phase[envs] = 0
+        d.jump[envs] = False
+        d.crouch[envs] = False
+        d.alive[envs] = True
+        d.height[envs] = d.stand_height
+        d.fitness[envs] = 0
+        self.ovalid[envs] = False
+        self.speed[envs] = self.speed_table[self.difficulty.index(0, 0)]
+        self.score[envs] = 0
+        self.ticks[envs] = 0
+        self.spawn_pos[envs] = 0
+        for k in envs:
+            self._load_next_spawn(k)
+
+    def _load_next_spawn(self, k):
+        seed = int(self.seeds[k])
+        if seed not in self.streams:
+            self.streams[seed] = ObstacleStream(seed, difficulty=self.difficulty)
+        tick, y_pos, height = self.streams[seed][self.spawn_pos[k]]
+        self.next_tick[k] = tick
+        self.next_y[k] = y_pos
+        self.next_h[k] = height
+
+    def _closest(self):
+        """Índice do obstáculo mais próximo de cada instância e se ela tem algum"""
+        has = self.ovalid.any(axis=1)
+        head = np.argmin(np.where(self.ovalid, self.ox, np.inf), axis=1)
+        return head, has
+
+    def get_state(self):
+        """Observações (K, 4), no mesmo formato de DinoGame.get_state"""
+        envs = np.arange(self.num_envs)
+        head, has = self._closest()
+        state = np.empty((self.num_envs, 4))
+        state[:, 0] = self.dinos.y / self.height
+        distance = (self.ox[envs, head] - self.dinos.x) / self.width
+        state[:, 1] = np.where(has, np.clip(distance, 0.0, 1.0), 1.0)
+        state[:, 2] = np.where(has, self.oh[envs, head] / self.height, 0.0)
+        state[:, 3] = np.where(has, self.oy[envs, head] / self.height, 0.0)
+        return state
+
+    def step(self, actions):
+        """
+        Avança um tick em todas as instâncias ativas.
+
+        Retorna (observações, recompensas, dones, info). A recompensa é a que
+        DinoGame soma ao fitness do dino (0 no tick da colisão); info traz
+        'episode_return' e 'episode_ticks' das instâncias que terminaram.
+        """
+        actions = np.asarray(actions)
+        d = self.dinos
+        envs = np.arange(self.num_envs)
+        active = d.alive.copy()
+        self.ticks[active] += 1
+
+        d.apply_actions(actions, active)
+        # Teste vertical só para os pares (instância, obstáculo) na coluna do dino
+        rows, cols = np.nonzero(self.ovalid & d.overlaps_x(self.ox))
+        hit = np.zeros(self.num_envs, dtype=bool)
+        hit[rows[d.overlaps_y(self.oy[rows, cols], self.oh[rows, cols], rows)]] = True
+        collided = hit & active
+
+        # Recompensa (regras de DinoGame._calculate_reward)
+        head, has = self._closest()
+        reward = np.full(self.num_envs, 0.1)
+        near = has & (50 < self.ox[envs, head] - d.x) & (self.ox[envs, head] - d.x < 100)
+        floating = self.oy[envs, head] < self.height - 100
+        reward[near & floating & (actions == 1)] += 1.0
+        reward[near & ~floating & (actions == 2)] += 0.8
+        reward[collided] -= 2.0
+        survivors = active & ~collided
+        d.fitness[survivors] += reward[survivors]
+        rewards = np.where(survivors, reward, 0.0)
+        d.alive[collided] = False
+
+        # Os obstáculos andam também no tick da colisão, como em DinoGame.step
+        self._generate_obstacles(active)
+        self._update_obstacles(active)
+
+        dones = collided
+        if self.max_ticks is not None:
+            truncated = survivors & (self.ticks >= self.max_ticks)
+            d.alive[truncated] = False
+            dones = dones | truncated
+
+        finished = np.flatnonzero(dones)
+        self.episode_returns[finished] = d.fitness[finished]
+        self.episode_ticks[finished] = self.ticks[finished]
+        info = {'episode_return': self.episode_returns[finished],
+                'episode_ticks': self.episode_ticks[finished],
+                'finished': finished}
+        if self.auto_reset and len(finished):
+            self._reset_envs(finished)
+
+        return self.get_state(), rewards, dones, info
+
+    def _generate_obstacles(self, running):
+        """Coloca na borda direita os obstáculos programados para este tick"""
+        spawn = np.flatnonzero(running & (self.next_tick <= self.ticks))
+        for k in spawn:
+            slot = np.argmin(self.ovalid[k])
+            if self.ovalid[k, slot]:
+                slot = self.capacity
+                self._grow()
+            self.ox[k, slot] = self.width
+            self.oy[k, slot] = self.next_y[k]
+            self.oh[k, slot] = self.next_h[k]
+            self.ovalid[k, slot] = True
+            self.spawn_pos[k] += 1
+            self._load_next_spawn(k)
+
+    def _grow(self):
+        """Dobra a capacidade de obstáculos de todas as instâncias"""
+        extra = max(1, self.capacity)
+        for name in ('ox', 'oy', 'oh', 'ovalid'):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.zeros((self.num_envs, extra), array.dtype)],
+                                               axis=1))
+        self.capacity += extra
+
+    def _update_obstacles(self, running):
+        """Move os obstáculos e remove os que saíram da tela (regras de DinoGame)"""
+        envs = np.flatnonzero(running & self.ovalid.any(axis=1))
+        if not len(envs):
+            return
+        if self.difficulty.progress == 'ticks':
+            self.speed[envs] = self.speed_table[self._progress(envs)]
+        head, _ = self._closest()
+        head = head[envs]
+        # O primeiro obstáculo anda antes; se sair da tela, a velocidade pode
+        # mudar antes de os demais andarem (mesma ordem de DinoGame)
+        self.ox[envs, head] -= self.speed[envs]
+        expired = self.ox[envs, head] < -50
+        gone = envs[expired]
+        self.ovalid[gone, head[expired]] = False
+        self.score[gone] += 1
+        if self.difficulty.progress == 'score':
+            # Velocidade da nova pontuação (tabela da dificuldade)
+            self.speed[gone] = self.speed_table[self._progress(gone)]
+
+        move = np.zeros_like(self.ovalid)
+        move[envs] = self.ovalid[envs]
+        move[envs[~expired], head[~expired]] = False
+        self.ox -= np.where(move, self.speed[:, None], 0.0)
+
+    def _progress(self, envs):
+        """Posição nas tabelas da dificuldade de cada instância (como Difficulty.index)"""
+        progress = self.score[envs] if self.difficulty.progress == 'score' else self.ticks[envs]
+        return np.minimum(progress + self.difficulty.level, self.difficulty.TABLE_SIZE - 1)
+
+def play_genomes(genomes, config, seeds, max_ticks=None):
+    """
+    Joga cada genoma em cada seed de uma vez, num único VecDinoEnv.
+
+    O custo por tick é o de um passo vetorizado, não o de len(seeds)
+    episódios. Retorna arrays (genomas, seeds) com o fitness, os ticks
+    sobrevividos e a pontuação de cada episódio. Sem max_ticks, usa o
+    max_steps da seção [DinoEval] (config.eval), se houver.
+    """
+    if max_ticks is None:
+        max_ticks = getattr(getattr(config, 'eval', None), 'max_steps', 0) or None
+    genomes = [g[1] if isinstance(g, tuple) else g for g in genomes]
+    num_seeds = len(seeds)
+    env = VecDinoEnv(len(genomes) * num_seeds, auto_reset=False, max_ticks=max_ticks,
+                     difficulty=getattr(config, 'difficulty', None))
+    state = env.reset(np.tile(seeds, len(genomes)))
+    batch = BatchNetwork.create(genomes, config)
+    network = np.repeat(np.arange(len(genomes)), num_seeds)  # Rede de cada instância
+
+    actions = np.zeros(env.num_envs, dtype=np.int64)
+    while env.dinos.alive.any():
+        actions[:] = 0
+        alive = np.flatnonzero(env.dinos.alive)
+        actions[alive] = batch.actions(state[alive], rows=network[alive])
+        state, rewards, dones, info = env.step(actions)
+
+    shape = (len(genomes), num_seeds)
+    return (env.dinos.fitness.reshape(shape).copy(), env.ticks.reshape(shape).copy(),
+            env.score.reshape(shape).copy())
+
+def evaluate_genomes(genomes, config, seeds, max_ticks=None):
+    """Avalia cada genoma em várias seeds de uma vez e retorna o fitness médio"""
+    fitness, ticks, score = play_genomes(genomes, config, seeds, max_ticks)
+    return [float(f) for f in fitness.mean(axis=1)]